@@ -1,27 +1,37 @@
 import datetime
-from functools import wraps
+import uuid
 
-import dash
 import dash_auth
 import cx_Oracle
-from flask import Flask
+import redis
+from flask import Flask, jsonify
 from flask_caching import Cache
 
 from li_dbs import ECLIPSE_PROD, GISLICLD
 from config import USERNAME_PASSWORD_PAIRS, REDIS_URL
+from utils.business_days import read_business_days
+from utils.dataset_cache import DatasetCache, RefreshPolicy
+from utils.db_pool import ConnectionPool
+from utils.downloads import download
+from utils.frame_cache import FrameCache
+from utils.layouts import LayoutCache
+from utils.locks import RedisLeases
+from utils.records import RecordsDash
 
+# Upper bound on the decoded DataFrames each worker process keeps in memory
+FRAME_CACHE_MAX_BYTES = 1024 * 1024 * 1024
 
-def cache_timeout(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        now = datetime.datetime.now()
-        deadline = now.replace(hour=6, minute=0)
-        period = (deadline - now)
-        f.cache_timeout = period.seconds
-        return f(*args, **kwargs)
-    return decorated_function
+# Oracle connections each worker process keeps open, and how long one query may run (seconds)
+DB_POOL_MIN_SIZE = 2
+DB_POOL_MAX_SIZE = 8
+DB_QUERY_TIMEOUT = 10 * 60
 
-con = GISLICLD.GISLICLD
+# The nightly ETL has reloaded the dashboard tables by 6am
+NIGHTLY = RefreshPolicy(refresh_at=datetime.time(6, 0))
+
+pool = ConnectionPool(GISLICLD.GISLICLD, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                      call_timeout=DB_QUERY_TIMEOUT)
+con = pool.connection
 
 external_stylesheets = ['https://unpkg.com/phila-standards@0.11.2/dist/css/phila-app.min.css']
 
@@ -32,16 +42,66 @@ meta_tags=[
     }]
 
 server = Flask(__name__)
-app = dash.Dash(server=server, external_stylesheets=external_stylesheets, meta_tags=meta_tags)
+app = RecordsDash(server=server, external_stylesheets=external_stylesheets, meta_tags=meta_tags)
 auth = dash_auth.BasicAuth(app, USERNAME_PASSWORD_PAIRS)
 app.config.suppress_callback_exceptions = True
 app.css.config.serve_locally = True
 app.scripts.config.serve_locally = True
 
+# Prefixed, so invalidate_data() clears only the dashboards' keys and not the leases in the same
+# Redis database
 cache = Cache(app.server, config={
     'CACHE_TYPE': 'redis',
-    'CACHE_REDIS_URL': REDIS_URL
+    'CACHE_REDIS_URL': REDIS_URL,
+    'CACHE_KEY_PREFIX': 'dashboards/'
 })
 
+def data_version(*keys):
+    # Every dataset changes when the nightly refresh time passes and when warmup.py or
+    # invalidate_data() has replaced them all. keys are the version keys of particular datasets
+    # (see DatasetCache.version_key), which change when a stale one is recomputed on its own.
+    return tuple(cache.get_many('data_version', *keys)) + (NIGHTLY.last_refresh(datetime.datetime.now()),)
+
+def frame_version(query, args):
+    return data_version(dataset_cache.version_key(query, args))
+
+def layout_version(page):
+    # A page's layout is drawn from all of its datasets
+    return data_version(*[dataset_cache.version_key(page.query_data, (dataset,)) for dataset in page.DATASETS])
+
+def bump_data_version():
+    cache.set('data_version', uuid.uuid4().hex, timeout=0)
+
+def invalidate_data():
+    cache.clear()
+    bump_data_version()
+    frame_cache.clear()
+    layout_cache.clear()
+
+redis_client = redis.Redis.from_url(REDIS_URL)
+leases = RedisLeases(redis_client)
+dataset_cache = DatasetCache(cache, leases=leases)
+frame_cache = FrameCache(max_bytes=FRAME_CACHE_MAX_BYTES, version=frame_version)
+layout_cache = LayoutCache(version=layout_version)
+
+@dataset_cache.memoize(NIGHTLY)
+def business_days():
+    # The business day calendar the SLA dashboards count days open with, read once per refresh for both
+    with con() as connection:
+        return read_business_days(connection)
+
+def lease_metrics():
+    # Time spent waiting for and holding the dataset rebuild leases, summed over every worker
+    return jsonify(leases.metrics())
+
+server.add_url_rule('/lease-metrics', 'lease_metrics', auth.index_auth_wrapper(lease_metrics))
+# The dashboards' download links, see utils.downloads.csv_href
+server.add_url_rule('/download/<name>/<filename>', 'download', auth.index_auth_wrapper(download))
+
+@server.cli.command('invalidate-cache')
+def invalidate_cache_command():
+    invalidate_data()
+    print('Dashboard cache invalidated')
+
 now = datetime.datetime.now()
 print('App initialized: ' + str(now))
@@ -1,15 +1,19 @@
 import os
-import urllib.parse
 
 import dash_core_components as dcc
 import dash_html_components as html
 import dash_table_experiments as table
 import plotly.graph_objs as go
-import pandas as pd
 from dash.dependencies import Input, Output
 import numpy as np
 
-from app import app, cache, cache_timeout
+from app import app, dataset_cache, frame_cache, NIGHTLY
+from utils.categoricals import categorize
+from utils.data_access import read_frame
+from utils.downloads import csv_href, xlsx_href, downloadable
+from utils.indexes import FilterIndex, presort
+from utils.paging import page, paged_table, table_columns
+from utils.serialization import serialize_frame
 
 APP_NAME = os.path.basename(__file__)
 
@@ -19,13 +23,19 @@ message_values_with_issues = ['ACCOUNT AND ENTITY NOT RELATED',
                               'EIN, SSN OR ACCOUNT ID MUST BE FILLED IN',
                               'ENTITY/ACCOUNT NOT FOUND']
 
-@cache_timeout
-@cache.memoize()
-def query_data():
+DATASETS = {'df_ind': NIGHTLY}
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['Message', 'License Type']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'Expiration Date'
+
+@dataset_cache.memoize(DATASETS)
+def query_data(dataset):
     from app import con
     with con() as con:
         sql = 'SELECT DISTINCT * FROM expiring_licenses'
-        df = pd.read_sql_query(sql=sql, con=con, parse_dates=['EXPIRATIONDATE'])
+        df = read_frame(con, sql, parse_dates=['EXPIRATIONDATE'])
     # Rename the columns to be more readable
     df = (df.rename(columns={'LEGALNAME': 'Legal Name',
                              'BUSINESS_NAME': 'Business Name',
@@ -36,18 +46,19 @@ def query_data():
                              'BUSINESSID': 'Business ID',
                              'LICENSENUMBER': 'License Number',
                              'LINK': 'Link'}))
-    return df.to_json(date_format='iso', orient='split')
+    return serialize_frame(categorize(presort(df, DATE_COLUMN), FILTER_COLUMNS))
 
-@cache_timeout
-@cache.memoize()
-def dataframe():
-    return pd.read_json(query_data(), orient='split', convert_dates=['Expiration Date'])
+def dataframe(dataset):
+    return frame_cache.load(query_data, dataset)
+
+def filter_index(dataset):
+    return frame_cache.derive('filter_index', lambda df: FilterIndex(df, FILTER_COLUMNS, DATE_COLUMN), query_data, dataset)
 
 def update_layout():
-    df = dataframe()
+    df = dataframe('df_ind')
 
     summary_table = (df.copy(deep=True)
-                   .groupby(['Message'])['License Number'].count()
+                   .groupby(['Message'], observed=True)['License Number'].count()
                    .reset_index()
                    .rename(columns={'Message': 'Message Category',
                                     'License Number': 'Count'}))
@@ -103,13 +114,7 @@ def update_layout():
                 html.Div([
                     html.Div([
                         html.Div([
-                            table.DataTable(
-                                rows=[{}],
-                                editable=False,
-                                sortable=True,
-                                filterable=True,
-                                id='expiring-licenses-table'
-                            ),
+                            paged_table('expiring-licenses-table'),
                         ], id='expiring-licenses-table-div'),
                         html.Div([
                             html.A(
@@ -118,6 +123,14 @@ def update_layout():
                                 download='expiring-licenses.csv',
                                 href='',
                                 target='_blank',
+                            ),
+                            ' | ',
+                            html.A(
+                                'Download Excel',
+                                id='expiring-licenses-table-download-link-xlsx',
+                                download='expiring-licenses.xlsx',
+                                href='',
+                                target='_blank',
                             )
                         ], style={'text-align': 'right'})
                     ], style={'width': '100%', 'margin-left': 'auto', 'margin-right': 'auto','margin-top': '50px', 'margin-bottom': '50px'})
@@ -149,43 +162,39 @@ def update_layout():
 layout = update_layout
 
 def update_data(selected_start, selected_end, selected_message, selected_license_type):
-    df_selected = dataframe()
-
-    if selected_message != "All":
-        df_selected = df_selected[(df_selected['Message'] == selected_message)]
-    if selected_license_type != "All":
-        df_selected = df_selected[(df_selected['License Type'] == selected_license_type)]
-
-    df_selected = (df_selected.loc[(df_selected['Expiration Date'] >= selected_start) & (df_selected['Expiration Date'] <= selected_end)]
-                              .sort_values(by='Expiration Date'))
-
-    return df_selected
+    # Already in Expiration Date order, df_ind is presorted on it
+    return filter_index('df_ind').select({'Message': selected_message, 'License Type': selected_license_type},
+                                         all_value="All", start=selected_start, end=selected_end)
 
 
+@downloadable
 def update_table_data(selected_start, selected_end, selected_message, selected_license_type):
     df_selected = update_data(selected_start, selected_end, selected_message, selected_license_type)
     return df_selected[df_selected['Message'].isin(message_values_with_issues)]
 
 
 @app.callback(
-    Output('expiring-licenses-table', 'rows'),
+    [Output('expiring-licenses-table-download-link', 'href'),
+     Output('expiring-licenses-table-download-link-xlsx', 'href')],
     [Input('expiring-licenses-date-picker-range', 'start_date'),
      Input('expiring-licenses-date-picker-range', 'end_date'),
      Input('expiring-licenses-message-dropdown', 'value'),
-     Input('expiring-licenses-license-type-dropdown', 'value'),])
-def update_table(start_date, end_date, message, license_type):
-    df_results = update_table_data(start_date, end_date, message, license_type)
-    return df_results.to_dict('records')
+     Input('expiring-licenses-license-type-dropdown', 'value')])
+def update_download_link(start_date, end_date, message, license_type):
+    return (csv_href(update_table_data, start_date, end_date, message, license_type, filename='expiring-licenses.csv'),
+            xlsx_href(update_table_data, start_date, end_date, message, license_type, filename='expiring-licenses.xlsx'))
 
 
 @app.callback(
-    Output('expiring-licenses-table-download-link', 'href'),
+    [Output('expiring-licenses-table', 'columns'),
+     Output('expiring-licenses-table', 'data')],
     [Input('expiring-licenses-date-picker-range', 'start_date'),
      Input('expiring-licenses-date-picker-range', 'end_date'),
      Input('expiring-licenses-message-dropdown', 'value'),
-     Input('expiring-licenses-license-type-dropdown', 'value')])
-def update_table_download_link(start_date, end_date, message, license_type):
-    df_results = update_table_data(start_date, end_date, message, license_type)
-    csv_string = df_results.to_csv(index=False, encoding='utf-8')
-    csv_string = "data:text/csv;charset=utf-8," + urllib.parse.quote(csv_string)
-    return csv_string
\ No newline at end of file
+     Input('expiring-licenses-license-type-dropdown', 'value'),
+     Input('expiring-licenses-table', 'pagination_settings'),
+     Input('expiring-licenses-table', 'sorting_settings'),
+     Input('expiring-licenses-table', 'filtering_settings')])
+def update_table_page(start_date, end_date, message, license_type, pagination_settings, sorting_settings, filtering_settings):
+    df = update_table_data(start_date, end_date, message, license_type)
+    return table_columns(df), page(df, pagination_settings, sorting_settings, filtering_settings)
@@ -0,0 +1,306 @@
+from datetime import date
+
+import dash_core_components as dcc
+import dash_html_components as html
+import dash_table_experiments as dt
+import plotly.graph_objs as go
+from dash.dependencies import Input, Output
+
+from app import app, con, dataset_cache, frame_cache, NIGHTLY
+from utils.dashboards import Dashboard, Dataset, download_link, last_ddl_time, options
+from utils.data_access import day, members, read_frame, where
+from utils.date_features import dates, month_start, text
+from utils.downloads import csv_href, xlsx_href
+from utils.paging import paged_table
+from utils.records import Records
+from utils.serialization import serialize_frame
+from utils.time_series import fill_missing, month_starts
+
+# Incomplete Processes, the page of apps.IncompleteProcessesBL and apps.IncompleteProcessesTL
+
+# Filter in Oracle for each selection instead of holding the whole table, for when it gets too big
+PUSHDOWN_FILTERS = False
+
+# Rename the columns to be more readable
+COLUMNS = {'PROCESSID': 'Process ID', 'PROCESSTYPE': 'Process Type', 'JOBNUMBER': 'Job Number',
+           'JOBTYPE': 'Job Type', 'LICENSETYPE': 'License Type',
+           'ASSIGNEDSTAFF': 'Assigned Staff',
+           'NUMASSIGNEDSTAFF': 'Num of Assigned Staff',
+           'SCHEDULEDSTARTDATE': 'Scheduled Start Date', 'TIMESINCESCHEDULEDSTARTDATE': 'Days Open',
+           'JOBLINK': 'Job Link'}
+
+def prepare(df):
+    df = df.rename(columns=COLUMNS)
+    df['DateText'] = text(df['SCHEDULEDSTARTDATEFIELD'], '%b %Y')
+    df['Month Year'] = month_start(df['SCHEDULEDSTARTDATEFIELD'])
+    return df
+
+def prepare_dims(df):
+    df = df.rename(columns=COLUMNS)
+    df['Month Year'] = dates(df['SCHEDULEDSTARTDATEFIELD'])
+    return df
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['Assigned Staff', 'Process Type', 'Job Type', 'License Type']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'SCHEDULEDSTARTDATEFIELD'
+# What the graphs group by and aggregate, pre-aggregated per day by rollup
+ROLLUP_LABELS = ['Month Year', 'DateText']
+ROLLUP_MEASURES = {'Process ID': 'count'}
+
+def dashboard(module, prefix, license, table, average_days_open=True):
+    # The page of one license kind ('Business' or 'Trade'), reading the incomplete processes in
+    # table. The counts table shows the average days open when average_days_open.
+    datasets = {'last_ddl_time': last_ddl_time(table)}
+    if PUSHDOWN_FILTERS:
+        # Every combination of dropdown values with the months it has processes in, for the layout
+        # and the graph's months when the rows themselves are queried per selection. The whole table
+        # isn't a dataset then, so warmup.py never loads it.
+        datasets['df_dims'] = Dataset('SELECT DISTINCT ASSIGNEDSTAFF, PROCESSTYPE, JOBTYPE, LICENSETYPE, '
+                                      "TRUNC(SCHEDULEDSTARTDATEFIELD, 'MM') SCHEDULEDSTARTDATEFIELD FROM " + table,
+                                      parse_dates=['SCHEDULEDSTARTDATEFIELD'], prepare=prepare_dims)
+    else:
+        datasets['df_ind'] = Dataset(f'SELECT * FROM {table}', parse_dates=['SCHEDULEDSTARTDATEFIELD'],
+                                     prepare=prepare, indexed=True)
+    page = Dashboard(app, dataset_cache, frame_cache, con, module, prefix, datasets, policy=NIGHTLY,
+                     filter_columns=FILTER_COLUMNS, date_column=DATE_COLUMN,
+                     rollup_labels=ROLLUP_LABELS, rollup_measures=ROLLUP_MEASURES)
+
+    @page.query(NIGHTLY)
+    def query_filtered(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type):
+        clause, params = where('SCHEDULEDSTARTDATEFIELD', selected_start, selected_end,
+                               {'ASSIGNEDSTAFF': selected_staff, 'PROCESSTYPE': selected_process_type,
+                                'JOBTYPE': selected_job_type, 'LICENSETYPE': selected_license_type})
+        with con() as connection:
+            df = read_frame(connection, f'SELECT * FROM {table}' + clause, params,
+                            parse_dates=['SCHEDULEDSTARTDATEFIELD'])
+        return serialize_frame(prepare(df))
+
+    def select(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type):
+        if PUSHDOWN_FILTERS:
+            # "ALL" / "All" means no filter on that column
+            return frame_cache.load(query_filtered, day(selected_start), day(selected_end),
+                                    members(None if selected_staff == "ALL" else selected_staff),
+                                    members(None if selected_process_type == "All" else selected_process_type),
+                                    members(None if selected_job_type == "All" else selected_job_type),
+                                    members(None if selected_license_type == "All" else selected_license_type))
+        return page.filter_index().select(filters(selected_staff, selected_process_type, selected_job_type, selected_license_type),
+                                          all_value="All", start=selected_start, end=selected_end)
+
+    def update_layout():
+        df = page.dataframe('df_dims' if PUSHDOWN_FILTERS else 'df_ind')
+
+        return html.Div(children=[
+                    html.H1(f'Incomplete Processes ({license} Licenses)', style={'text-align': 'center'}),
+                    html.P(page.last_updated(), style = {'text-align': 'center'}),
+                    html.Div([
+                        html.Div([
+                            html.P('Scheduled Start Date of Process'),
+                            dcc.DatePickerRange(
+                                display_format='MMM Y',
+                                id=page.id('date-picker-range'),
+                                start_date=df['SCHEDULEDSTARTDATEFIELD'].dt.date.min(),
+                                end_date=date.today()
+                            ),
+                        ], className='four columns'),
+                        html.Div([
+                            html.P('Assigned Staff'),
+                            dcc.Dropdown(
+                                    id=page.id('staff-dropdown'),
+                                    options=options(df['Assigned Staff'].unique(), all_value='ALL'),
+                                    value='ALL'
+                            ),
+                        ], className='four columns')
+                    ], className='dashrow filters'),
+                    html.Div([
+                        html.Div([
+                            html.P('License Type'),
+                            dcc.Dropdown(
+                                id=page.id('license-type-dropdown'),
+                                options=options(df['License Type'].unique(), all_value='All'),
+                                value='All'
+                            ),
+                        ], className='twelve columns')
+                    ], className='dashrow filters'),
+                    html.Div([
+                        html.Div([
+                            html.P('Job Type'),
+                            dcc.Dropdown(
+                                id=page.id('job-type-dropdown'),
+                                options=options(df['Job Type'].unique(), all_value='All'),
+                                value='All'
+                            ),
+                        ], className='four columns'),
+                        html.Div([
+                            html.P('Process Type'),
+                            dcc.Dropdown(
+                                id=page.id('process-type-dropdown'),
+                                options=options(df['Process Type'].unique(), all_value='All'),
+                                value='All'
+                            ),
+                        ], className='four columns')
+                    ], className='dashrow filters'),
+                    html.Div([
+                        html.Div([
+                            dcc.Graph(
+                                id=page.id('graph'),
+                                config={
+                                    'displayModeBar': False
+                                },
+                                figure=go.Figure(
+                                    data=[],
+                                    layout=go.Layout(
+                                        title='Incomplete Processes by Scheduled Start Month',
+                                        yaxis=dict(
+                                            title='Incomplete Processes'
+                                        ),
+                                        xaxis=dict(
+                                            title='Scheduled Start Month'
+                                        )
+                                    )
+                                )
+                            )
+                        ], className='twelve columns'),
+                    ], className='dashrow'),
+                    html.Div([
+                        html.Div([
+                            html.H3('Incomplete Processes by Assigned Staff and Process Type', style={'text-align': 'center'}),
+                            html.Div([
+                                dt.DataTable(
+                                    rows=[{}],
+                                    editable=False,
+                                    sortable=True,
+                                    filterable=True,
+                                    id=page.id('count-table')
+                                ),
+                            ], style={'text-align': 'center'},
+                               id=page.id('count-table-div')
+                            ),
+                            html.Div([
+                                download_link(page.id('count-table-download-link'), f'{prefix}-counts.csv'),
+                                ' | ',
+                                download_link(page.id('count-table-download-link-xlsx'), f'{prefix}-counts.xlsx', 'Download Excel')
+                            ], style={'text-align': 'right'})
+                        ], style={'margin-top': '50px', 'margin-bottom': '50px'})
+                    ], className='dashrow'),
+                    html.Div([
+                        html.Div([
+                            html.H3('Incomplete Processes', style={'text-align': 'center'}),
+                            html.Div([
+                                paged_table(page.id('ind-records-table')),
+                            ], style={'text-align': 'center'},
+                                id=page.id('ind-records-table-div')
+                            ),
+                            html.Div([
+                                download_link(page.id('ind-records-table-download-link'), f'{prefix}-ind-records.csv'),
+                                ' | ',
+                                download_link(page.id('ind-records-table-download-link-xlsx'), f'{prefix}-ind-records.xlsx', 'Download Excel')
+                            ], style={'text-align': 'right'})
+                        ], style={'margin-top': '50px', 'margin-bottom': '50px'})
+                    ], className='dashrow'),
+                    html.Details([
+                        html.Summary('Query Description'),
+                        html.Div([
+                            html.P(
+                                f'Incomplete {license.lower()} license processes by assigned staff member.')
+                        ])
+                    ])
+                ])
+
+    page.layout = update_layout
+
+    def update_graph_data(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type):
+        if PUSHDOWN_FILTERS:
+            df_selected = (select(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type)
+                           .groupby(['Month Year', 'DateText']).agg({'Process ID': 'count'})
+                           .reset_index())
+        else:
+            df_selected = page.rollup().aggregate(['Month Year', 'DateText'],
+                                                  filters(selected_staff, selected_process_type, selected_job_type, selected_license_type),
+                                                  all_value="All", start=selected_start, end=selected_end)
+        df_selected = df_selected.rename(columns={'Process ID': 'Incomplete Processes'})
+        df_selected = fill_missing(df_selected, 'Month Year', month_starts(selected_start, selected_end),
+                                   {'DateText': lambda month: month.strftime('%b %Y'), 'Incomplete Processes': 0})
+        return df_selected.sort_values(by='Month Year', ascending=False)
+
+    @page.downloadable
+    def update_counts_table_data(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type):
+        df_selected = (select(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type)
+                       .groupby(['Assigned Staff', 'Process Type'], observed=True).agg({'Process ID': 'count', 'Days Open': 'sum'})
+                       .reset_index()
+                       .rename(columns={'Process ID': 'Incomplete Processes'})
+                       .sort_values(by=['Assigned Staff', 'Process Type']))
+        if not average_days_open:
+            return df_selected[['Assigned Staff', 'Process Type', 'Incomplete Processes']]
+        df_selected['Avg. Days Open'] = (df_selected['Days Open'] / df_selected['Incomplete Processes']).round(0)
+        return df_selected[['Assigned Staff', 'Process Type', 'Incomplete Processes', 'Avg. Days Open']]
+
+    @page.downloadable
+    def update_ind_records_table_data(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type):
+        df_selected = (select(selected_start, selected_end, selected_staff, selected_process_type, selected_job_type, selected_license_type)
+                       .sort_values(by='SCHEDULEDSTARTDATEFIELD'))
+        df_selected['Days Open'] = df_selected['Days Open'].round(0)
+        return df_selected.drop(['Process ID', 'SCHEDULEDSTARTDATEFIELD', 'Month Year', 'DateText'], axis=1)
+
+    inputs = [Input(page.id('date-picker-range'), 'start_date'),
+              Input(page.id('date-picker-range'), 'end_date'),
+              Input(page.id('staff-dropdown'), 'value'),
+              Input(page.id('process-type-dropdown'), 'value'),
+              Input(page.id('job-type-dropdown'), 'value'),
+              Input(page.id('license-type-dropdown'), 'value')]
+
+    @app.callback(
+        [Output(page.id('graph'), 'figure'),
+         Output(page.id('count-table'), 'rows'),
+         Output(page.id('count-table-download-link'), 'href'),
+         Output(page.id('count-table-download-link-xlsx'), 'href'),
+         Output(page.id('ind-records-table-download-link'), 'href'),
+         Output(page.id('ind-records-table-download-link-xlsx'), 'href')],
+        inputs)
+    def update_page(start_date, end_date, staff, process_type, job_type, license_type):
+        df_counts = update_counts_table_data(start_date, end_date, staff, process_type, job_type, license_type)
+        return (graph(update_graph_data(start_date, end_date, staff, process_type, job_type, license_type)),
+                Records(df_counts),
+                csv_href(update_counts_table_data, start_date, end_date, staff, process_type, job_type, license_type, filename=f'{prefix}-counts.csv'),
+                xlsx_href(update_counts_table_data, start_date, end_date, staff, process_type, job_type, license_type, filename=f'{prefix}-counts.xlsx'),
+                csv_href(update_ind_records_table_data, start_date, end_date, staff, process_type, job_type, license_type, filename=f'{prefix}-ind-records.csv'),
+                xlsx_href(update_ind_records_table_data, start_date, end_date, staff, process_type, job_type, license_type, filename=f'{prefix}-ind-records.xlsx'))
+
+    page.table_callback(page.id('ind-records-table'), inputs, update_ind_records_table_data)
+
+    return page
+
+def filters(selected_staff, selected_process_type, selected_job_type, selected_license_type):
+    # The staff dropdown's "ALL" is no filter, like the others' "All"
+    return {'Assigned Staff': None if selected_staff == "ALL" else selected_staff,
+            'Process Type': selected_process_type,
+            'Job Type': selected_job_type,
+            'License Type': selected_license_type}
+
+def graph(df_results):
+    return {
+        'data': [
+            go.Scatter(
+                x=df_results['Month Year'],
+                y=df_results['Incomplete Processes'],
+                mode='lines',
+                text=df_results['DateText'],
+                hoverinfo='text+y',
+                line=dict(
+                    shape='spline',
+                    color='rgb(26, 118, 255)'
+                ),
+                name='Incomplete Processes'
+            )
+        ],
+        'layout': go.Layout(
+                title='Incomplete Processes by Scheduled Start Month',
+                yaxis=dict(
+                    title='Incomplete Processes',
+                    range=[0, df_results['Incomplete Processes'].max() + (df_results['Incomplete Processes'].max() / 50)]
+                ),
+                xaxis=dict(
+                    title='Scheduled Start Month'
+                )
+        )
+    }
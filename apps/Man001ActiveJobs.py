@@ -0,0 +1,176 @@
+import dash_core_components as dcc
+import dash_html_components as html
+import plotly.graph_objs as go
+import pandas as pd
+from dash.dependencies import Input, Output
+
+from app import app, con, dataset_cache, frame_cache, NIGHTLY
+from utils.dashboards import Dashboard, Dataset, download_link, last_ddl_time, options
+from utils.downloads import csv_href, xlsx_href
+from utils.paging import paged_table
+from utils.time_series import fill_missing
+
+# Active Jobs, the page of apps.Man001ActiveJobsBL and apps.Man001ActiveJobsTL
+
+time_categories = ["0-1 Day", "2-5 Days", "6-10 Days", "11 Days-1 Year", "Over 1 Year"]
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['TIMESINCESCHEDULEDSTARTDATE', 'LICENSETYPE']
+
+def prepare_counts(df):
+    # Make TIMESINCESCHEDULEDSTARTDATE a Categorical Series and give it a sort order
+    df['TIMESINCESCHEDULEDSTARTDATE'] = pd.Categorical(df['TIMESINCESCHEDULEDSTARTDATE'], time_categories)
+    return df.sort_values(by='TIMESINCESCHEDULEDSTARTDATE')
+
+def dashboard(module, prefix, license, table, amend, description):
+    # The page of one license kind ('Business' or 'Trade'), reading the jobs of table_ind and their
+    # counts in table_counts. amend is the JOBTYPE of the amend/renew jobs.
+    page = Dashboard(app, dataset_cache, frame_cache, con, module, prefix,
+                     datasets={'df_ind': Dataset(f'SELECT * FROM {table}_ind', indexed=True),
+                               'df_counts': Dataset(f'SELECT * FROM {table}_counts', prepare=prepare_counts,
+                                                    indexed=True),
+                               'ind_last_ddl_time': last_ddl_time(f'{table}_ind'),
+                               'counts_last_ddl_time': last_ddl_time(f'{table}_counts')},
+                     policy=NIGHTLY, filter_columns=FILTER_COLUMNS)
+
+    def update_layout():
+        df_counts = page.dataframe('df_counts')
+
+        duration_options = []
+        for duration in df_counts['TIMESINCESCHEDULEDSTARTDATE'].unique():
+            duration_options.append({'label': str(duration), 'value': duration})
+
+        return html.Div(
+            children=[
+                html.H1(
+                    'Active Jobs With Completed Completeness Checks',
+                    style={'margin-top': '10px'}
+                ),
+                html.H1(
+                    f'({license} Licenses)',
+                    style={'margin-bottom': '50px'}
+                ),
+                html.Div([
+                    html.Div([
+                        html.P('Time Since Scheduled Start Date of Process'),
+                        dcc.Dropdown(
+                            id=page.id('duration-dropdown'),
+                            options=duration_options,
+                            multi=True
+                        ),
+                    ], className='four columns'),
+                    html.Div([
+                        html.P('License Type'),
+                        dcc.Dropdown(
+                            id=page.id('licensetype-dropdown'),
+                            options=options(df_counts['LICENSETYPE'].unique(), all_value='All'),
+                            value='All',
+                            searchable=True
+                        ),
+                    ], className='six columns'),
+                ], className='dashrow filters'),
+                html.Div([
+                    dcc.Graph(
+                        id=page.id('my-graph'),
+                        config={
+                            'displayModeBar': False
+                        },
+                        figure=graph(df_counts, license, amend)
+                    )
+                ], style={'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'},
+                    className='nine columns'),
+                html.P(page.last_updated('counts_last_ddl_time'), className = 'timestamp', style = {'text-align': 'center'}),
+                html.Div([
+                    html.Div([
+                        html.Div([
+                            paged_table(page.id('table'))
+                        ], style={'text-align': 'center'}),
+                        html.Div([
+                            download_link(page.id('download-link'), f'{prefix}.csv'),
+                            ' | ',
+                            download_link(page.id('download-link-xlsx'), f'{prefix}.xlsx', 'Download Excel')
+                        ], style={'text-align': 'right'})
+                    ], style={'margin-top': '70px', 'margin-bottom': '50px'})
+                ], className='dashrow'),
+                html.P(page.last_updated('ind_last_ddl_time'), className = 'timestamp', style = {
+                    'text-align': 'center'}),
+                html.Details([
+                    html.Summary('Query Description'),
+                    html.Div(description)
+                ])
+            ])
+
+    page.layout = update_layout
+
+    @page.downloadable
+    def get_data_object(duration, license_type):
+        df_selected = page.filter_index('df_ind').select({'TIMESINCESCHEDULEDSTARTDATE': duration, 'LICENSETYPE': license_type}, all_value="All")
+        return df_selected.drop(['PROCESSID'], axis=1)
+
+    def update_counts_graph_data(duration, license_type):
+        df_counts_selected = page.filter_index('df_counts').select({'TIMESINCESCHEDULEDSTARTDATE': duration, 'LICENSETYPE': license_type}, all_value="All")
+        df_grouped = (df_counts_selected.groupby(by=['JOBTYPE', 'TIMESINCESCHEDULEDSTARTDATE'], observed=True)['JOBCOUNTS']
+                      .sum()
+                      .reset_index())
+        df_grouped['JOBTYPE'] = df_grouped['JOBTYPE'].astype(str)
+        df_grouped['TIMESINCESCHEDULEDSTARTDATE'] = pd.Categorical(df_grouped['TIMESINCESCHEDULEDSTARTDATE'], time_categories)
+        # Every duration on the axis, from the Application bars
+        application = df_grouped['JOBTYPE'] == 'Application'
+        df_grouped = pd.concat([df_grouped[~application],
+                                fill_missing(df_grouped[application], 'TIMESINCESCHEDULEDSTARTDATE', time_categories,
+                                             {'JOBTYPE': 'Application', 'JOBCOUNTS': 0})],
+                               ignore_index=True)
+        df_grouped['TIMESINCESCHEDULEDSTARTDATE'] = pd.Categorical(df_grouped['TIMESINCESCHEDULEDSTARTDATE'], time_categories)
+        return df_grouped.sort_values(by='TIMESINCESCHEDULEDSTARTDATE')
+
+    inputs = [Input(page.id('duration-dropdown'), 'value'),
+              Input(page.id('licensetype-dropdown'), 'value')]
+
+    @app.callback(
+        [Output(page.id('my-graph'), 'figure'),
+         Output(page.id('download-link'), 'href'),
+         Output(page.id('download-link-xlsx'), 'href')],
+        inputs)
+    def update_page(duration, license_type):
+        return (graph(update_counts_graph_data(duration, license_type), license, amend),
+                csv_href(get_data_object, duration, license_type, filename=f'{prefix}.csv'),
+                xlsx_href(get_data_object, duration, license_type, filename=f'{prefix}.xlsx'))
+
+    page.table_callback(page.id('table'), inputs, get_data_object)
+
+    return page
+
+def graph(df_counts, license, amend):
+    return {
+        'data': [
+             go.Bar(
+                 x=df_counts[df_counts['JOBTYPE'] == 'Application']['TIMESINCESCHEDULEDSTARTDATE'],
+                 y=df_counts[df_counts['JOBTYPE'] == 'Application']['JOBCOUNTS'],
+                 name='Application',
+                 marker=go.bar.Marker(
+                     color='rgb(55, 83, 109)'
+                 )
+             ),
+             go.Bar(
+                 x=df_counts[df_counts['JOBTYPE'] == amend]['TIMESINCESCHEDULEDSTARTDATE'],
+                 y=df_counts[df_counts['JOBTYPE'] == amend]['JOBCOUNTS'],
+                 name='Amendment/Renewal',
+                 marker=go.bar.Marker(
+                     color='rgb(26, 118, 255)'
+                 )
+             )
+        ],
+        'layout': go.Layout(
+            xaxis=dict(
+                title='Time Since Scheduled Start Date of Process'
+            ),
+            yaxis=dict(
+                title=f'Active {license} License Jobs'
+            ),
+            showlegend=True,
+            legend=go.layout.Legend(
+                x=.75,
+                y=1
+            )
+        )
+    }
@@ -0,0 +1,177 @@
+import dash_core_components as dcc
+import dash_html_components as html
+import plotly.graph_objs as go
+import pandas as pd
+from dash.dependencies import Input, Output
+
+from app import app, con, dataset_cache, frame_cache, NIGHTLY
+from utils.dashboards import Dashboard, Dataset, download_link, last_ddl_time, options
+from utils.downloads import csv_href, xlsx_href
+from utils.paging import paged_table
+from utils.time_series import fill_missing
+
+# Active Processes, the page of apps.Man002ActiveProcessesBL and apps.Man002ActiveProcessesTL
+
+time_categories = ["0-1 Day", "2-5 Days", "6-10 Days", "11 Days-1 Year", "Over 1 Year"]
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['PROCESSTYPE', 'LICENSETYPE']
+
+def prepare_counts(df):
+    # Make TIMESINCESCHEDULEDSTARTDATE a Categorical Series and give it a sort order
+    df['TIMESINCESCHEDULEDSTARTDATE'] = pd.Categorical(df['TIMESINCESCHEDULEDSTARTDATE'], time_categories)
+    return df.sort_values(by='TIMESINCESCHEDULEDSTARTDATE')
+
+def dashboard(module, prefix, license, table, amend, description):
+    # The page of one license kind ('Business' or 'Trade'), reading the processes of table_ind and
+    # their counts in table_counts. amend is the JOBTYPE of the amend/renew jobs.
+    page = Dashboard(app, dataset_cache, frame_cache, con, module, prefix,
+                     datasets={'df_ind': Dataset(f'SELECT * FROM {table}_ind', indexed=True),
+                               'df_counts': Dataset(f'SELECT * FROM {table}_counts', prepare=prepare_counts,
+                                                    indexed=True),
+                               'ind_last_ddl_time': last_ddl_time(f'{table}_ind'),
+                               'counts_last_ddl_time': last_ddl_time(f'{table}_counts')},
+                     policy=NIGHTLY, filter_columns=FILTER_COLUMNS)
+
+    def update_layout():
+        df_counts = page.dataframe('df_counts')
+
+        return html.Div([
+            html.H1(
+                'Active Processes',
+                style={'margin-top': '10px'}
+            ),
+            html.H1(
+                f'({license} Licenses)',
+                style={'margin-bottom': '50px'}
+            ),
+            html.Div([
+                html.Div([
+                    html.P('Process Type'),
+                    dcc.Dropdown(
+                        id=page.id('processtype-dropdown'),
+                        options=options(df_counts['PROCESSTYPE'].unique()),
+                        multi=True
+                    ),
+                ], className='four columns'),
+                html.Div([
+                    html.P('License Type'),
+                    dcc.Dropdown(
+                        id=page.id('licensetype-dropdown'),
+                        options=options(df_counts['LICENSETYPE'].unique(), all_value='All'),
+                        value='All',
+                        searchable=True
+                    ),
+                ], className='six columns'),
+            ], className='dashrow filters'),
+            html.Div([
+                dcc.Graph(
+                    id=page.id('graph'),
+                    config={
+                        'displayModeBar': False
+                    },
+                    figure=graph(df_counts, amend)
+                )
+            ], style={'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'},
+                className='nine columns'),
+            html.P(page.last_updated('counts_last_ddl_time'), className = 'timestamp', style = {
+            'text-align': 'center'}),
+            html.Div([
+                html.Div([
+                    html.Div([
+                        paged_table(page.id('table'))
+                    ], style={'text-align': 'center'}),
+                    html.Div([
+                        download_link(page.id('download-link'), f'{prefix}.csv'),
+                        ' | ',
+                        download_link(page.id('download-link-xlsx'), f'{prefix}.xlsx', 'Download Excel')
+                    ], style={'text-align': 'right'}),
+                ], style={'margin-top': '70px', 'margin-bottom': '50px'})
+            ], className='dashrow'),
+            html.P(page.last_updated('ind_last_ddl_time'), className = 'timestamp', style = {
+            'text-align': 'center'}),
+            html.Details([
+                html.Summary('Query Description'),
+                html.Div(description)
+            ])
+        ])
+
+    page.layout = update_layout
+
+    @page.downloadable
+    def get_data_object(process_type, license_type):
+        df_selected = page.filter_index('df_ind').select({'PROCESSTYPE': process_type, 'LICENSETYPE': license_type}, all_value="All")
+        return df_selected.drop(['PROCESSID'], axis=1)
+
+    def update_counts_graph_data(process_type, license_type):
+        df_counts_selected = page.filter_index('df_counts').select({'PROCESSTYPE': process_type, 'LICENSETYPE': license_type}, all_value="All")
+        df_grouped = (df_counts_selected.groupby(by=['JOBTYPE', 'TIMESINCESCHEDULEDSTARTDATE'], observed=True)['PROCESSCOUNTS']
+                      .sum()
+                      .reset_index())
+        df_grouped['JOBTYPE'] = df_grouped['JOBTYPE'].astype(str)
+        df_grouped['TIMESINCESCHEDULEDSTARTDATE'] = pd.Categorical(df_grouped['TIMESINCESCHEDULEDSTARTDATE'], time_categories)
+        # Every duration on the axis, from the Application bars
+        application = df_grouped['JOBTYPE'] == 'Application'
+        df_grouped = pd.concat([df_grouped[~application],
+                                fill_missing(df_grouped[application], 'TIMESINCESCHEDULEDSTARTDATE', time_categories,
+                                             {'JOBTYPE': 'Application', 'PROCESSCOUNTS': 0})],
+                               ignore_index=True)
+        df_grouped['TIMESINCESCHEDULEDSTARTDATE'] = pd.Categorical(df_grouped['TIMESINCESCHEDULEDSTARTDATE'], time_categories)
+        return df_grouped.sort_values(by='TIMESINCESCHEDULEDSTARTDATE')
+
+    inputs = [Input(page.id('processtype-dropdown'), 'value'),
+              Input(page.id('licensetype-dropdown'), 'value')]
+
+    @app.callback(
+        [Output(page.id('graph'), 'figure'),
+         Output(page.id('download-link'), 'href'),
+         Output(page.id('download-link-xlsx'), 'href')],
+        inputs)
+    def update_page(process_type, license_type):
+        return (graph(update_counts_graph_data(process_type, license_type), amend),
+                csv_href(get_data_object, process_type, license_type, filename=f'{prefix}.csv'),
+                xlsx_href(get_data_object, process_type, license_type, filename=f'{prefix}.xlsx'))
+
+    page.table_callback(page.id('table'), inputs, get_data_object)
+
+    return page
+
+def graph(df_counts, amend):
+    return {
+        'data': [
+            go.Bar(
+                x=df_counts[df_counts['JOBTYPE'] == 'Application']['TIMESINCESCHEDULEDSTARTDATE'],
+                y=df_counts[df_counts['JOBTYPE'] == 'Application']['PROCESSCOUNTS'],
+                name='Applications',
+                marker=go.bar.Marker(
+                    color='rgb(55, 83, 109)'
+                )
+            ),
+            go.Bar(
+                x=df_counts[df_counts['JOBTYPE'] == amend]['TIMESINCESCHEDULEDSTARTDATE'],
+                y=df_counts[df_counts['JOBTYPE'] == amend]['PROCESSCOUNTS'],
+                name='Renewals/Amendments',
+                marker=go.bar.Marker(
+                    color='rgb(26, 118, 255)'
+                )
+            )
+        ],
+        'layout': go.Layout(
+            showlegend=True,
+            legend=go.layout.Legend(
+                x=.75,
+                y=1,
+            ),
+            xaxis=dict(
+                autorange=True,
+                tickangle=30,
+                tickfont=dict(
+                    size=11
+                )
+            ),
+            yaxis=dict(
+                title='Active Processes'
+            ),
+            margin=go.layout.Margin(l=40, r=0, t=40, b=100)
+        )
+    }
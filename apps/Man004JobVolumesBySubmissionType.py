@@ -0,0 +1,138 @@
+from datetime import datetime
+
+import dash_core_components as dcc
+import dash_html_components as html
+import dash_table_experiments as dt
+import pandas as pd
+from dash.dependencies import Input, Output
+
+from app import app, con, dataset_cache, frame_cache, NIGHTLY
+from utils.dashboards import Dashboard, Dataset, download_link, last_ddl_time, options
+from utils.downloads import csv_href, xlsx_href
+from utils.paging import paged_table
+from utils.records import Records
+
+# Job Volumes by Submission Type, the page of apps.Man004BLJobVolumesBySubmissionType and
+# apps.Man004TLJobVolumesBySubmissionType
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['CREATEDBYUSERNAME']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'JOBCREATEDDATEFIELD'
+
+def dashboard(module, prefix, license, table):
+    # The page of one license kind ('Business' or 'Trade'), reading the approved jobs in table
+    page = Dashboard(app, dataset_cache, frame_cache, con, module, prefix,
+                     datasets={'df_ind': Dataset(f'SELECT * FROM {table}', parse_dates=['JOBCREATEDDATEFIELD'],
+                                                 indexed=True),
+                               'last_ddl_time': last_ddl_time(table)},
+                     policy=NIGHTLY, filter_columns=FILTER_COLUMNS, date_column=DATE_COLUMN)
+
+    def update_layout():
+        df = page.dataframe('df_ind')
+        df_staff = df[df['CREATEDBYTYPE'] == 'Staff']
+
+        return html.Div(
+            children=[
+                html.H1(
+                    'Job Volumes by Submission Type',
+                    style={'margin-top': '10px'}
+                ),
+                html.H1(
+                    f'({license} Licenses)',
+                    style={'margin-bottom': '50px'}
+                ),
+                html.P(page.last_updated(), style = {'text-align': 'center'}),
+                html.Div([
+                    html.Div([
+                        html.P('Please Select Date Range (Job Created Date)'),
+                        dcc.DatePickerRange(
+                            id=page.id('date-picker-range'),
+                            start_date=datetime(2018, 1, 1),
+                            end_date=datetime.now()
+                        ),
+                    ], className='four columns'),
+                    html.Div([
+                        html.P('Filter by Username (Staff only)'),
+                        dcc.Dropdown(
+                            id=page.id('username-dropdown'),
+                            options=options(df_staff['CREATEDBYUSERNAME'].unique()),
+                            multi=True
+                        ),
+                    ], className='five columns')
+                ], className='dashrow filters'),
+                html.Div([
+                    html.Div([
+                        html.Div([
+                            dt.DataTable(
+                                rows=[{}],
+                                sortable=True,
+                                editable=False,
+                                selected_row_indices=[],
+                                id=page.id('counttable')
+                            ),
+                        ], id=page.id('counttable-div'))
+                    ], style={'margin-top': '70px', 'margin-bottom': '50px',
+                              'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'},
+                        className='nine columns')
+                ], className='dashrow'),
+                html.Div([
+                    html.Div([
+                        html.Div([
+                            paged_table(page.id('table'))
+                        ]),
+                        html.Div([
+                            download_link(page.id('download-link'), f'{prefix}.csv'),
+                            ' | ',
+                            download_link(page.id('download-link-xlsx'), f'{prefix}.xlsx', 'Download Excel')
+                        ], style={'text-align': 'right'})
+                    ], style={'margin-top': '70px', 'margin-bottom': '50px'})
+                ], className='dashrow'),
+                html.Details([
+                    html.Summary('Query Description'),
+                    html.Div([
+                        html.P(f'All approved {license.lower()} license amend/renew and application jobs, how they were '
+                               'submitted (online, revenue, or staff), and who they were submitted by.'),
+                        html.P('We determine how a job was submitted (online, revenue, or staff) based on the username who created it:'),
+                        html.Ul(children=[
+                            html.Li('Online: If the username contains a number or equals "PPG User"'),
+                            html.Li('Revenue: If the username equals "POSSE system power user"'),
+                            html.Li('Staff: If the username doesn\'t meet one of the other two conditions')
+                        ])
+                    ])
+                ])
+            ])
+
+    page.layout = update_layout
+
+    @page.downloadable
+    def get_data_object(selected_start, selected_end, username):
+        df_selected = page.filter_index().select({'CREATEDBYUSERNAME': username}, start=selected_start, end=selected_end)
+        return df_selected.drop(['JOBCREATEDDATEFIELD', 'JOBOBJECTID'], axis=1)
+
+    def count_jobs(selected_start, selected_end, username):
+        df_count_selected = page.filter_index().select({'CREATEDBYUSERNAME': username}, start=selected_start, end=selected_end)
+        df_counter = df_count_selected.groupby(by=['CREATEDBYTYPE', 'JOBTYPE'], as_index=False).agg({'JOBOBJECTID': pd.Series.nunique})
+        df_counter = df_counter.rename(columns={'CREATEDBYTYPE': 'Job Submission Type', 'JOBTYPE': 'Job Type', 'JOBOBJECTID': 'Count of Jobs Submitted'})
+        if len(df_counter['Count of Jobs Submitted']) > 0:
+            df_counter['Count of Jobs Submitted'] = df_counter.apply(lambda x: "{:,}".format(x['Count of Jobs Submitted']), axis=1)
+        return df_counter
+
+    inputs = [Input(page.id('date-picker-range'), 'start_date'),
+              Input(page.id('date-picker-range'), 'end_date'),
+              Input(page.id('username-dropdown'), 'value')]
+
+    @app.callback(
+        [Output(page.id('counttable'), 'rows'),
+         Output(page.id('download-link'), 'href'),
+         Output(page.id('download-link-xlsx'), 'href')],
+        inputs)
+    def update_page(start_date, end_date, username_val):
+        df_counts = count_jobs(start_date, end_date, username_val)
+        return (Records(df_counts),
+                csv_href(get_data_object, start_date, end_date, username_val, filename=f'{prefix}.csv'),
+                xlsx_href(get_data_object, start_date, end_date, username_val, filename=f'{prefix}.xlsx'))
+
+    page.table_callback(page.id('table'), inputs, get_data_object)
+
+    return page
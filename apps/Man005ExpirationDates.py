@@ -0,0 +1,271 @@
+from datetime import date
+
+import dash_core_components as dcc
+import dash_html_components as html
+import dash_table_experiments as dt
+import plotly.graph_objs as go
+from dash.dependencies import Input, Output
+from dateutil.relativedelta import relativedelta
+
+from app import app, con, dataset_cache, frame_cache, NIGHTLY
+from utils.dashboards import Dashboard, Dataset, download_link, last_ddl_time, options
+from utils.date_features import iso_week, month_start, text, week_ending
+from utils.downloads import csv_href, xlsx_href
+from utils.paging import paged_table
+from utils.records import Records
+from utils.time_series import fill_missing, month_starts, week_endings
+
+# Expiration Dates, the page of apps.Man005BLExpirationDates and apps.Man005TLExpirationDates
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['JOBTYPE', 'LICENSETYPE']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'EXPIRATIONDATE'
+# What the graphs group by and aggregate, pre-aggregated per day by rollup
+ROLLUP_LABELS = ['Month Year', 'MonthDateText', 'Year', 'YearText', 'Week', 'WeekText', 'Year Week']
+ROLLUP_MEASURES = {'LICENSENUMBER': 'count'}
+# The date features prepare adds, left out of the records table
+DATE_FEATURES = ['YearText', 'MonthDateText', 'WeekText', 'Year', 'Month Year', 'Week', 'Year Week']
+
+def prepare(df):
+    df['YearText'] = text(df['EXPIRATIONDATE'], '%Y')
+    df['MonthDateText'] = text(df['EXPIRATIONDATE'], '%b %Y')
+    df['WeekText'] = text(df['EXPIRATIONDATE'], '%W')
+    df['Year'] = df['EXPIRATIONDATE'].dt.year
+    df['Month Year'] = month_start(df['EXPIRATIONDATE'])
+    df['Week'] = iso_week(df['EXPIRATIONDATE'])
+    # The Sunday ending the week, where the weekly graph plots it
+    df['Year Week'] = week_ending(df['EXPIRATIONDATE'])
+    return df
+
+def dashboard(module, prefix, license, table, description):
+    # The page of one license kind ('Business' or 'Trade'), reading the approved jobs in table
+    page = Dashboard(app, dataset_cache, frame_cache, con, module, prefix,
+                     datasets={'df_ind': Dataset(f'SELECT * FROM {table}', parse_dates=['EXPIRATIONDATE'],
+                                                 prepare=prepare, indexed=True),
+                               'last_ddl_time': last_ddl_time(table)},
+                     policy=NIGHTLY, filter_columns=FILTER_COLUMNS, date_column=DATE_COLUMN,
+                     rollup_labels=ROLLUP_LABELS, rollup_measures=ROLLUP_MEASURES)
+
+    def update_layout():
+        df = page.dataframe('df_ind')
+
+        return html.Div(
+            children=[
+                html.H1(
+                    'Expiration Dates',
+                    style={'margin-top': '10px'}
+                ),
+                html.H1(
+                    f'({license} Licenses)',
+                    style={'margin-bottom': '20px'}
+                ),
+                html.P(page.last_updated(), style = {'text-align': 'center'}),
+            html.Div([
+                html.Div([
+                    html.P('Expiration Date'),
+                    dcc.DatePickerRange(
+                        id=page.id('my-date-picker-range'),
+                        start_date=date.today(),
+                        end_date=date.today() + relativedelta(months=+12)
+                    ),
+                ], className='four columns', style={'margin-left': '10%'}),
+                html.Div([
+                    html.P('Aggregate Data by...'),
+                    dcc.Dropdown(
+                        id=page.id('time-agg-dropdown'),
+                        options=[
+                            {'label': 'Month', 'value': 'Month'},
+                            {'label': 'Week', 'value': 'Week'}
+                        ],
+                        value='Month'
+                    ),
+                ], className='four columns', style={'margin-left': '10%'}),
+            ], className='dashrow filters'),
+            html.Div([
+                html.Div([
+                    html.P('Job Type'),
+                    dcc.Dropdown(
+                        id=page.id('jobtype-dropdown'),
+                        options=options(df['JOBTYPE'].unique(), all_value='All'),
+                        value='All'
+                    ),
+                ], className='four columns', style={'margin-left': '10%'}),
+                html.Div([
+                    html.P('License Type'),
+                    dcc.Dropdown(
+                        id=page.id('licensetype-dropdown'),
+                        options=options(df['LICENSETYPE'].unique(), all_value='All'),
+                        value='All',
+                        searchable=True
+                    ),
+                ], className='four columns', style={'margin-left': '10%'}),
+            ], className='dashrow filters'),
+            html.Div([
+                html.Div([
+                    dcc.Graph(
+                        id=page.id('graph'),
+                        config={
+                            'displayModeBar': False
+                        },
+                        figure=go.Figure(
+                            data=[],
+                            layout=go.Layout(
+                                yaxis=dict(
+                                    title='Expiring Licenses'
+                                )
+                            )
+                        )
+                    )
+                ], className='twelve columns'),
+            ], className='dashrow'),
+            html.Div([
+                html.Div([
+                    html.Div([
+                        dt.DataTable(
+                            rows=[{}],
+                            columns=["Job Type", "License Type", "Expiring Licenses"],
+                            filterable=True,
+                            sortable=True,
+                            editable=False,
+                            selected_row_indices=[],
+                            id=page.id('count-table')
+                        )
+                    ], id=page.id('count-table-div')),
+                    html.Div([
+                        download_link(page.id('count-table-download-link'),
+                                      f'{prefix}ExpirationVolumesBySubmissionType-counts.csv'),
+                        ' | ',
+                        download_link(page.id('count-table-download-link-xlsx'),
+                                      f'{prefix}ExpirationVolumesBySubmissionType-counts.xlsx', 'Download Excel')
+                    ], style={'text-align': 'right'})
+                ], style={'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'},
+                    className='nine columns')
+            ], className='dashrow'),
+            html.Div([
+                html.Div([
+                    html.Div([
+                        paged_table(page.id('table'))
+                    ]),
+                    html.Div([
+                        download_link(page.id('table-download-link'),
+                                      f'{prefix}ExpirationVolumesBySubmissionType-ind-records.csv'),
+                        ' | ',
+                        download_link(page.id('table-download-link-xlsx'),
+                                      f'{prefix}ExpirationVolumesBySubmissionType-ind-records.xlsx', 'Download Excel')
+                    ], style={'text-align': 'right'})
+                ], style={'margin-top': '70px', 'margin-bottom': '50px',
+                          'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'})
+            ], className='dashrow'),
+            html.Details([
+                html.Summary('Query Description'),
+                html.Div([
+                    html.P(description)
+                ])
+            ])
+        ])
+
+    page.layout = update_layout
+
+    def update_graph_data(selected_start, selected_end, selected_time_agg, selected_job_type, selected_license_type):
+        df_rollup = page.rollup()
+        filters = {'JOBTYPE': selected_job_type, 'LICENSETYPE': selected_license_type}
+
+        if selected_time_agg == "Month":
+            df_selected = (df_rollup.aggregate(['Month Year', 'MonthDateText'], filters, all_value="All",
+                                               start=selected_start, end=selected_end)
+                           .rename(index=str, columns={"Month Year": "Expiration Date", "MonthDateText": "DateText", "LICENSENUMBER": "Expiring Licenses"}))
+            df_selected = fill_missing(df_selected, 'Expiration Date', month_starts(selected_start, selected_end),
+                                       {'DateText': lambda month: month.strftime('%b %Y'), 'Expiring Licenses': 0})
+            return df_selected.sort_values(by='Expiration Date', ascending=False)
+        elif selected_time_agg == "Week":
+            df_selected = (df_rollup.aggregate(['Year', 'YearText', 'Week', 'WeekText', 'Year Week'], filters, all_value="All",
+                                               start=selected_start, end=selected_end)
+                           .rename(index=str, columns={"Year Week": "Expiration Date", "LICENSENUMBER": "Expiring Licenses"}))
+            df_selected['DateText'] = df_selected['YearText'] + ' week ' + df_selected['WeekText']
+            df_selected = fill_missing(df_selected, 'Expiration Date', week_endings(selected_start, selected_end),
+                                       {'DateText': lambda week: week.strftime('%Y week %W'), 'Expiring Licenses': 0})
+            return df_selected.sort_values(by='Expiration Date', ascending=False)
+
+    @page.downloadable
+    def count_jobs(selected_start, selected_end, selected_job_type, selected_license_type):
+        df_selected = page.filter_index().select({'JOBTYPE': selected_job_type, 'LICENSETYPE': selected_license_type},
+                                                 all_value="All", start=selected_start, end=selected_end)
+
+        df_selected = (df_selected
+                       .groupby(['JOBTYPE', 'LICENSETYPE'], observed=True).agg({'LICENSENUMBER': 'count'})
+                       .reset_index()
+                       .rename(index=str, columns={"JOBTYPE": "Job Type", "LICENSETYPE": "License Type", "LICENSENUMBER": "Expiring Licenses"}))
+        df_selected['Expiring Licenses'] = df_selected.apply(lambda x: "{:,}".format(x['Expiring Licenses']), axis=1)
+        return df_selected
+
+    def records(selected_start, selected_end, selected_job_type, selected_license_type):
+        df_selected = page.filter_index().select({'JOBTYPE': selected_job_type, 'LICENSETYPE': selected_license_type},
+                                                 all_value="All", start=selected_start, end=selected_end)
+        return df_selected.drop(DATE_FEATURES, axis=1)
+
+    @page.downloadable
+    def get_data_object(selected_start, selected_end, selected_job_type, selected_license_type):
+        df_selected = records(selected_start, selected_end, selected_job_type, selected_license_type)
+        df_selected['EXPIRATIONDATE'] = us_date(df_selected['EXPIRATIONDATE'])
+        return df_selected
+
+    inputs = [Input(page.id('my-date-picker-range'), 'start_date'),
+              Input(page.id('my-date-picker-range'), 'end_date'),
+              Input(page.id('jobtype-dropdown'), 'value'),
+              Input(page.id('licensetype-dropdown'), 'value')]
+
+    @app.callback(
+        Output(page.id('graph'), 'figure'),
+        inputs[:2] + [Input(page.id('time-agg-dropdown'), 'value')] + inputs[2:])
+    def update_graph(start_date, end_date, time_agg, jobtype, licensetype):
+        return graph(update_graph_data(start_date, end_date, time_agg, jobtype, licensetype))
+
+    @app.callback(
+        [Output(page.id('count-table'), 'rows'),
+         Output(page.id('count-table-download-link'), 'href'),
+         Output(page.id('count-table-download-link-xlsx'), 'href'),
+         Output(page.id('table-download-link'), 'href'),
+         Output(page.id('table-download-link-xlsx'), 'href')],
+        inputs)
+    def update_tables(start_date, end_date, jobtype, licensetype):
+        df_counts = count_jobs(start_date, end_date, jobtype, licensetype)
+        return (Records(df_counts),
+                csv_href(count_jobs, start_date, end_date, jobtype, licensetype, filename=f'{prefix}ExpirationVolumesBySubmissionType-counts.csv'),
+                xlsx_href(count_jobs, start_date, end_date, jobtype, licensetype, filename=f'{prefix}ExpirationVolumesBySubmissionType-counts.xlsx'),
+                csv_href(get_data_object, start_date, end_date, jobtype, licensetype, filename=f'{prefix}ExpirationVolumesBySubmissionType-ind-records.csv'),
+                xlsx_href(get_data_object, start_date, end_date, jobtype, licensetype, filename=f'{prefix}ExpirationVolumesBySubmissionType-ind-records.xlsx'))
+
+    # Sorted and filtered as dates, only the rows shown are formatted
+    page.table_callback(page.id('table'), inputs, records, formats={'EXPIRATIONDATE': us_date})
+
+    return page
+
+def us_date(dates):
+    # Change date format to make it consistent with other dates
+    return dates.dt.strftime('%m/%d/%Y')
+
+def graph(df_results):
+    return {
+        'data': [
+            go.Scatter(
+                x=df_results['Expiration Date'],
+                y=df_results['Expiring Licenses'],
+                mode='lines',
+                text=df_results['DateText'],
+                hoverinfo='text+y',
+                line=dict(
+                    shape='spline',
+                    color='rgb(26, 118, 255)'
+                ),
+                name='Expiring Licenses'
+            )
+        ],
+        'layout': go.Layout(
+                title='Expiring Licenses',
+                yaxis=dict(
+                    title='Expiring Licenses',
+                    range=[0, df_results['Expiring Licenses'].max() + (df_results['Expiring Licenses'].max() / 25)]
+                )
+        )
+    }
@@ -1,6 +1,5 @@
 import os
-import urllib.parse
-from datetime import datetime
+from datetime import date, datetime
 
 import dash_core_components as dcc
 import dash_html_components as html
@@ -9,57 +8,85 @@ import plotly.graph_objs as go
 import pandas as pd
 from dash.dependencies import Input, Output
 
-from app import app, cache, cache_timeout
+from app import app, dataset_cache, frame_cache, NIGHTLY
+from utils.categoricals import categorize
+from utils.dashboards import options
+from utils.data_access import day, members, read_frame, where
+from utils.downloads import csv_href, xlsx_href, downloadable
+from utils.indexes import FilterIndex, presort
+from utils.paging import paged_table, table_callback
+from utils.records import Records
+from utils.serialization import serialize_frame
 
 APP_NAME = os.path.basename(__file__)
 
 print(APP_NAME)
 
-@cache_timeout
-@cache.memoize()
+# Filter in Oracle for each selection instead of holding the whole table, for when it gets too big
+PUSHDOWN_FILTERS = False
+
+# The whole table is only loaded (and warmed) when the callbacks filter it in pandas
+DATASETS = {'df_dims' if PUSHDOWN_FILTERS else 'df_ind': NIGHTLY, 'last_ddl_time': NIGHTLY}
+
+START_DATE = datetime(2018, 1, 1)
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['LICENSETYPE', 'INSPECTIONON', 'INSPECTOR']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'SCHEDULEDINSPECTIONDATEFIELD'
+
+@dataset_cache.memoize(DATASETS)
 def query_data(dataset):
     from app import con
     with con() as con:
         if dataset == 'df_ind':
             sql = 'SELECT * FROM li_dash_overdueinsp_bl'
-            df = pd.read_sql_query(sql=sql, con=con)
+            df = categorize(presort(read_frame(con, sql, parse_dates=[DATE_COLUMN]), DATE_COLUMN), FILTER_COLUMNS)
+        elif dataset == 'df_dims':
+            # The dropdown options, for the layout when the rows themselves are queried per selection
+            sql = 'SELECT DISTINCT LICENSETYPE, INSPECTIONON, INSPECTOR FROM li_dash_overdueinsp_bl'
+            df = read_frame(con, sql)
         elif dataset == 'last_ddl_time':
             sql = 'SELECT SCN_TO_TIMESTAMP(MAX(ora_rowscn)) last_ddl_time FROM LI_DASH_OVERDUEINSP_BL'
-            df = pd.read_sql_query(sql=sql, con=con)
-    return df.to_json(date_format='iso', orient='split')
+            df = read_frame(con, sql)
+    return serialize_frame(df)
+
+@dataset_cache.memoize(NIGHTLY)
+def query_filtered(selected_start, selected_end, license_type, inspection_on, inspector):
+    from app import con
+    clause, params = where('SCHEDULEDINSPECTIONDATEFIELD', selected_start, selected_end,
+                           {'LICENSETYPE': license_type, 'INSPECTIONON': inspection_on, 'INSPECTOR': inspector})
+    with con() as con:
+        df = read_frame(con, 'SELECT * FROM li_dash_overdueinsp_bl' + clause, params)
+    return serialize_frame(df)
 
-@cache_timeout
-@cache.memoize()
 def dataframe(dataset):
-    return pd.read_json(query_data(dataset), orient='split')
+    return frame_cache.load(query_data, dataset)
+
+def filter_index(dataset):
+    return frame_cache.derive('filter_index', lambda df: FilterIndex(df, FILTER_COLUMNS, DATE_COLUMN), query_data, dataset)
+
+def select(selected_start, selected_end, license_type, inspection_on, inspector):
+    if PUSHDOWN_FILTERS:
+        return frame_cache.load(query_filtered, day(selected_start), day(selected_end),
+                                members(license_type), members(inspection_on), members(inspector))
+    return filter_index('df_ind').select({'LICENSETYPE': license_type, 'INSPECTIONON': inspection_on, 'INSPECTOR': inspector},
+                                         start=selected_start, end=selected_end)
 
 def get_df_time_since(df):
     df_time_since = df.groupby(['TIMEOVERDUE']).agg({'INSPECTIONOBJECTID': 'count'})
     return df_time_since
 
 def update_layout():
-    df = dataframe('df_ind')
     last_ddl_time = dataframe('last_ddl_time')
 
-    df_time_since = get_df_time_since(df)
-
-    licensetype_options_unsorted = []
-    for licensetype in df['LICENSETYPE'].unique():
-        if str(licensetype) != "nan":
-            licensetype_options_unsorted.append({'label': str(licensetype), 'value': licensetype})
-    licensetype_options_sorted = sorted(licensetype_options_unsorted, key=lambda k: k['label'])
-
-    inspectionon_options_unsorted = []
-    for inspectionon in df['INSPECTIONON'].unique():
-        if str(inspectionon) != "nan":
-            inspectionon_options_unsorted.append({'label': str(inspectionon), 'value': inspectionon})
-    inspectionon_options_sorted = sorted(inspectionon_options_unsorted, key=lambda k: k['label'])
-
-    inspector_options_unsorted = []
-    for inspector in df['INSPECTOR'].unique():
-        if str(inspector) != "nan":
-            inspector_options_unsorted.append({'label': str(inspector), 'value': inspector})
-    inspector_options_sorted = sorted(inspector_options_unsorted, key=lambda k: k['label'])
+    if PUSHDOWN_FILTERS:
+        df = dataframe('df_dims')
+        # The same selection the pie chart callback starts with, so they share the cached query
+        df_time_since = get_df_time_since(select(START_DATE, date.today(), None, None, None))
+    else:
+        df = dataframe('df_ind')
+        df_time_since = get_df_time_since(df)
 
     return html.Div(
         children=[
@@ -77,7 +104,7 @@ def update_layout():
                     html.P('Please Select Date Range (Scheduled Inspection Date)'),
                     dcc.DatePickerRange(
                         id='Man006BL-my-date-picker-range',
-                        start_date=datetime(2018, 1, 1),
+                        start_date=START_DATE,
                         end_date=datetime.now()
                     )
                 ], className='five columns'),
@@ -85,7 +112,7 @@ def update_layout():
                     html.P('Inspector'),
                     dcc.Dropdown(
                         id='inspector-dropdown',
-                        options=inspector_options_sorted,
+                        options=options(df['INSPECTOR'].unique()),
                         multi=True
                     )
                 ], className='five columns'),
@@ -95,7 +122,7 @@ def update_layout():
                     html.P('License Type'),
                     dcc.Dropdown(
                         id='licensetype-dropdown',
-                        options=licensetype_options_sorted,
+                        options=options(df['LICENSETYPE'].unique()),
                         multi=True
                     ),
                 ], className='five columns'),
@@ -103,7 +130,7 @@ def update_layout():
                     html.P('Inspection On'),
                     dcc.Dropdown(
                         id='inspectionon-dropdown',
-                        options=inspectionon_options_sorted,
+                        options=options(df['INSPECTIONON'].unique()),
                         multi=True
                     ),
                 ], className='five columns'),
@@ -127,6 +154,14 @@ def update_layout():
                             href='',
                             target='_blank'
                         ),
+                        ' | ',
+                        html.A(
+                            'Download Excel',
+                            id='Man006BL-count-table-download-link-xlsx',
+                            download='Man006BL-counts.xlsx',
+                            href='',
+                            target='_blank'
+                        ),
                     ], style={'text-align': 'right'})
                 ], style={'margin-top': '70px', 'margin-bottom': '50px',
                           'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'},
@@ -155,14 +190,7 @@ def update_layout():
                 ], className='twelve columns'),
             ], className='dashrow'),
             html.Div([
-                dt.DataTable(
-                    rows=[{}],
-                    filterable=True,
-                    sortable=True,
-                    editable=False,
-                    selected_row_indices=[],
-                    id='Man006BL-table'
-                ),
+                paged_table('Man006BL-table'),
             ], style={'width': '100%', 'margin-left': 'auto', 'margin-right': 'auto'},
                 id='Man006BL-table-div'
             ),
@@ -174,6 +202,14 @@ def update_layout():
                     href='',
                     target='_blank'
                 ),
+                ' | ',
+                html.A(
+                    'Download Excel',
+                    id='Man006BL-download-link-xlsx',
+                    download='Man006BL.xlsx',
+                    href='',
+                    target='_blank'
+                ),
             ], style={'text-align': 'right', 'margin-right': '5%'}),
             html.Details([
                 html.Summary('Query Description'),
@@ -186,116 +222,29 @@ def update_layout():
 layout = update_layout
 
 
-def get_data_object(selected_start, selected_end, license_type, inspection_on, inspector):
-    df_selected = dataframe('df_ind')
-    df_selected = df_selected[(df_selected['SCHEDULEDINSPECTIONDATEFIELD'] >= selected_start) & (df_selected['SCHEDULEDINSPECTIONDATEFIELD'] <= selected_end)]
-    if license_type is not None:
-        if isinstance(license_type, str):
-            df_selected = df_selected[df_selected['LICENSETYPE'] == license_type]
-        elif isinstance(license_type, list):
-            if len(license_type) > 1:
-                df_selected = df_selected[df_selected['LICENSETYPE'].isin(license_type)]
-            elif len(license_type) == 1:
-                df_selected = df_selected[df_selected['LICENSETYPE'] == license_type[0]]
-    if inspection_on is not None:
-        if isinstance(inspection_on, str):
-            df_selected = df_selected[df_selected['INSPECTIONON'] == inspection_on]
-        elif isinstance(inspection_on, list):
-            if len(inspection_on) > 1:
-                df_selected = df_selected[df_selected['INSPECTIONON'].isin(inspection_on)]
-            elif len(inspection_on) == 1:
-                df_selected = df_selected[df_selected['INSPECTIONON'] == inspection_on[0]]
-    if inspector is not None:
-        if isinstance(inspector, str):
-            df_selected = df_selected[df_selected['INSPECTOR'] == inspector]
-        elif isinstance(inspector, list):
-            if len(inspector) > 1:
-                df_selected = df_selected[df_selected['INSPECTOR'].isin(inspector)]
-            elif len(inspector) == 1:
-                df_selected = df_selected[df_selected['INSPECTOR'] == inspector[0]]
-    if len(df_selected['DAYSOVERDUE']) > 0:
-        df_selected['DAYSOVERDUE'] = df_selected.apply(lambda x: "{:,}".format(x['DAYSOVERDUE']), axis=1)
+def records(selected_start, selected_end, license_type, inspection_on, inspector):
+    df_selected = select(selected_start, selected_end, license_type, inspection_on, inspector)
     return df_selected.drop('SCHEDULEDINSPECTIONDATEFIELD', axis=1)
 
+@downloadable
+def get_data_object(selected_start, selected_end, license_type, inspection_on, inspector):
+    df_selected = records(selected_start, selected_end, license_type, inspection_on, inspector)
+    return df_selected.assign(DAYSOVERDUE=days_overdue_text(df_selected['DAYSOVERDUE']))
+
+def days_overdue_text(days):
+    return days.map('{:,}'.format)
+
+@downloadable
 def count_jobs(selected_start, selected_end, license_type, inspection_on, inspector):
-    df_selected = dataframe('df_ind')
-    df_selected = df_selected[(df_selected['SCHEDULEDINSPECTIONDATEFIELD'] >= selected_start) & (df_selected['SCHEDULEDINSPECTIONDATEFIELD'] <= selected_end)]
-    if license_type is not None:
-        if isinstance(license_type, str):
-            df_selected = df_selected[df_selected['LICENSETYPE'] == license_type]
-        elif isinstance(license_type, list):
-            if len(license_type) > 1:
-                df_selected = df_selected[df_selected['LICENSETYPE'].isin(license_type)]
-            elif len(license_type) == 1:
-                df_selected = df_selected[df_selected['LICENSETYPE'] == license_type[0]]
-    if inspection_on is not None:
-        if isinstance(inspection_on, str):
-            df_selected = df_selected[df_selected['INSPECTIONON'] == inspection_on]
-        elif isinstance(inspection_on, list):
-            if len(inspection_on) > 1:
-                df_selected = df_selected[df_selected['INSPECTIONON'].isin(inspection_on)]
-            elif len(inspection_on) == 1:
-                df_selected = df_selected[df_selected['INSPECTIONON'] == inspection_on[0]]
-    if inspector is not None:
-        if isinstance(inspector, str):
-            df_selected = df_selected[df_selected['INSPECTOR'] == inspector]
-        elif isinstance(inspector, list):
-            if len(inspector) > 1:
-                df_selected = df_selected[df_selected['INSPECTOR'].isin(inspector)]
-            elif len(inspector) == 1:
-                df_selected = df_selected[df_selected['INSPECTOR'] == inspector[0]]
-    df_counts = df_selected.groupby(by=['LICENSETYPE', 'INSPECTIONON'], as_index=False).agg({'INSPECTIONOBJECTID': pd.Series.nunique})
+    df_selected = select(selected_start, selected_end, license_type, inspection_on, inspector)
+    df_counts = df_selected.groupby(by=['LICENSETYPE', 'INSPECTIONON'], as_index=False, observed=True).agg({'INSPECTIONOBJECTID': pd.Series.nunique})
     df_counts = df_counts.rename(columns={'LICENSETYPE': "License Type", 'INSPECTIONON': 'Inspection On', 'INSPECTIONOBJECTID': 'Overdue Inspections'})
     if len(df_counts['Overdue Inspections']) > 0:
         df_counts['Overdue Inspections'] = df_counts.apply(lambda x: "{:,}".format(x['Overdue Inspections']), axis=1)
     return df_counts
 
-#TODO why is this not including high date?
-
-
-@app.callback(Output('Man006BL-count-table', 'rows'),
-              [Input('Man006BL-my-date-picker-range', 'start_date'),
-               Input('Man006BL-my-date-picker-range', 'end_date'),
-               Input('licensetype-dropdown', 'value'),
-               Input('inspectionon-dropdown', 'value'),
-               Input('inspector-dropdown', 'value')])
-def updatecount_table(start_date, end_date, license_type_val, inspection_on_val, inspector_val):
-    df_counts = count_jobs(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
-    return df_counts.to_dict('records')
-
-@app.callback(
-            Output('Man006BL-count-table-download-link', 'href'),
-            [Input('Man006BL-my-date-picker-range', 'start_date'),
-             Input('Man006BL-my-date-picker-range', 'end_date'),
-             Input('licensetype-dropdown', 'lt_value'),
-             Input('inspectionon-dropdown', 'jt_value'),
-             Input('inspector-dropdown', 'inspector_value')])
-def update_count_table_download_link(start_date, end_date, license_type_val, inspection_on_val, inspector_val):
-    df_for_csv = count_jobs(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
-    csv_string = df_for_csv.to_csv(index=False, encoding='utf-8')
-    csv_string = "data:text/csv;charset=utf-8," + urllib.parse.quote(csv_string)
-    return csv_string
-
-@app.callback(Output('Man006BL-table', 'rows'),
-              [Input('Man006BL-my-date-picker-range', 'start_date'),
-               Input('Man006BL-my-date-picker-range', 'end_date'),
-               Input('licensetype-dropdown', 'value'),
-               Input('inspectionon-dropdown', 'value'),
-               Input('inspector-dropdown', 'value')])
-def update_table(start_date, end_date, license_type_val, inspection_on_val, inspector_val):
-    df_ind = get_data_object(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
-    return df_ind.to_dict('records')
-
-
 
-@app.callback(Output('time-since-piechart', 'figure'),
-            [Input('Man006BL-my-date-picker-range', 'start_date'),
-             Input('Man006BL-my-date-picker-range', 'end_date'),
-             Input('licensetype-dropdown', 'value'),
-             Input('inspectionon-dropdown', 'value'),
-             Input('inspector-dropdown', 'value')])
-def update_pie_chart(start_date, end_date, license_type_val, inspection_on_val, inspector_val):
-    df_results = get_data_object(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
+def update_pie_chart(df_results):
     df_time_since_results = get_df_time_since(df_results)
     return {
         'data': [
@@ -309,15 +258,35 @@ def update_pie_chart(start_date, end_date, license_type_val, inspection_on_val,
         ]
     }
 
+
 @app.callback(
-            Output('Man006BL-download-link', 'href'),
-            [Input('Man006BL-my-date-picker-range', 'start_date'),
-             Input('Man006BL-my-date-picker-range', 'end_date'),
-             Input('licensetype-dropdown', 'value'),
-             Input('inspectionon-dropdown', 'value'),
-             Input('inspector-dropdown', 'value')])
-def update_table_download_link(start_date, end_date, license_type_val, inspection_on_val, inspector_val):
-    df_for_csv = get_data_object(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
-    csv_string = df_for_csv.to_csv(index=False, encoding='utf-8')
-    csv_string = "data:text/csv;charset=utf-8," + urllib.parse.quote(csv_string)
-    return csv_string
\ No newline at end of file
+    [Output('Man006BL-count-table', 'rows'),
+     Output('Man006BL-count-table-download-link', 'href'),
+     Output('Man006BL-count-table-download-link-xlsx', 'href'),
+     Output('time-since-piechart', 'figure'),
+     Output('Man006BL-download-link', 'href'),
+     Output('Man006BL-download-link-xlsx', 'href')],
+    [Input('Man006BL-my-date-picker-range', 'start_date'),
+     Input('Man006BL-my-date-picker-range', 'end_date'),
+     Input('licensetype-dropdown', 'value'),
+     Input('inspectionon-dropdown', 'value'),
+     Input('inspector-dropdown', 'value')])
+def update_page(start_date, end_date, license_type_val, inspection_on_val, inspector_val):
+    df_counts = count_jobs(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
+    df_ind = select(start_date, end_date, license_type_val, inspection_on_val, inspector_val)
+    return (Records(df_counts),
+            csv_href(count_jobs, start_date, end_date, license_type_val, inspection_on_val, inspector_val, filename='Man006BL-counts.csv'),
+            xlsx_href(count_jobs, start_date, end_date, license_type_val, inspection_on_val, inspector_val, filename='Man006BL-counts.xlsx'),
+            update_pie_chart(df_ind),
+            csv_href(get_data_object, start_date, end_date, license_type_val, inspection_on_val, inspector_val, filename='Man006BL.csv'),
+            xlsx_href(get_data_object, start_date, end_date, license_type_val, inspection_on_val, inspector_val, filename='Man006BL.xlsx'))
+
+
+update_table = table_callback(
+    app, 'Man006BL-table',
+    [Input('Man006BL-my-date-picker-range', 'start_date'),
+     Input('Man006BL-my-date-picker-range', 'end_date'),
+     Input('licensetype-dropdown', 'value'),
+     Input('inspectionon-dropdown', 'value'),
+     Input('inspector-dropdown', 'value')],
+    records, formats={'DAYSOVERDUE': days_overdue_text})
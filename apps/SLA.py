@@ -0,0 +1,224 @@
+from datetime import datetime
+
+import dash_core_components as dcc
+import dash_html_components as html
+import plotly.graph_objs as go
+import numpy as np
+from dash.dependencies import Input, Output
+
+from app import app, business_days, con, dataset_cache, frame_cache, NIGHTLY
+from utils.dashboards import Dashboard, Dataset, last_ddl_time, options
+from utils.date_features import dates, month_start, text
+
+# SLA License Issuance, the page of apps.SLA_BL and apps.SLA_TL
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['Job Type']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'JOBCREATEDDATEFIELD'
+# What the graphs group by and aggregate, pre-aggregated per day by rollup
+ROLLUP_LABELS = ['Month Year', 'MonthDateText', 'Job Created Day', 'DayDateText']
+ROLLUP_MEASURES = {'Job ID': 'count', 'Process Completed Day': 'count', 'W/in SLA': 'sum'}
+# The time buckets of the graphs: the rollup labels each one groups by
+TIME_AGGS = {'Month': ['Month Year', 'MonthDateText'], 'Day': ['Job Created Day', 'DayDateText']}
+
+def prepare(df_ind):
+    # Rename columns to be more readable
+    df_ind = df_ind.rename(columns={'JOBID': 'Job ID', 'PROCESSID': 'Process ID', 'JOBTYPE': 'Job Type'})
+    df_ind['MonthDateText'] = text(df_ind['JOBCREATEDDATEFIELD'], '%b %Y')
+    df_ind['DayDateText'] = text(df_ind['JOBCREATEDDATEFIELD'], '%b %d %Y')
+
+    df_ind['Month Year'] = month_start(df_ind['JOBCREATEDDATEFIELD'])
+    df_ind['Job Created Day'] = dates(df_ind['JOBCREATEDDATEFIELD'])
+    df_ind['Process Completed Day'] = dates(df_ind['PROCESSDATECOMPLETEDFIELD'])
+
+    # The number of business days between the Job Created Date and the Process Completed Date, that the job was
+    # open/in progress
+    df_ind['Bus. Days Open'] = business_days().between(df_ind['JOBCREATEDDATEFIELD'],
+                                                       df_ind['PROCESSDATECOMPLETEDFIELD'])
+    # Flag each job as either being within SLA or not based on whether the job was open for 2 days or fewer
+    df_ind['W/in SLA'] = np.where(df_ind['Bus. Days Open'] <= 2, 1, 0)
+    return df_ind
+
+def dashboard(module, prefix, license, table):
+    # The page of one license kind ('Business' or 'Trade'), reading the SLA table of its jobs
+    page = Dashboard(app, dataset_cache, frame_cache, con, module, prefix,
+                     datasets={'df_ind': Dataset(f'SELECT * FROM {table}',
+                                                 parse_dates=['JOBCREATEDDATEFIELD', 'PROCESSDATECOMPLETEDFIELD'],
+                                                 prepare=prepare, indexed=True),
+                               'last_ddl_time': last_ddl_time(table)},
+                     policy=NIGHTLY, filter_columns=FILTER_COLUMNS, date_column=DATE_COLUMN,
+                     rollup_labels=ROLLUP_LABELS, rollup_measures=ROLLUP_MEASURES)
+
+    def update_layout():
+        df = page.dataframe('df_ind')
+
+        return html.Div(children=[
+                    html.H1(f'SLA License Issuance ({license} Licenses)', style={'text-align': 'center'}),
+                    html.P(page.last_updated(), style = {'text-align': 'center'}),
+                    html.Div([
+                        html.Div([
+                            html.P('Filter by Job Created Date'),
+                            dcc.DatePickerRange(
+                                display_format='MMM Y',
+                                id=page.id('date-picker-range'),
+                                start_date=datetime(2018, 1, 1),
+                                end_date=datetime.now()
+                            ),
+                        ], className='four columns'),
+                        html.Div([
+                            html.P('Filter by Job Type'),
+                            dcc.Dropdown(
+                                id=page.id('job-type-dropdown'),
+                                options=options(df['Job Type'].unique(), all_value='All'),
+                                value='All'
+                            ),
+                        ], className='four columns'),
+                        html.Div([
+                            html.P('Aggregate Data by...'),
+                            dcc.Dropdown(
+                                id=page.id('time-agg-dropdown'),
+                                options=[{'label': time_agg, 'value': time_agg} for time_agg in TIME_AGGS],
+                                value='Month'
+                            ),
+                        ], className='four columns'),
+                    ], className='dashrow filters'),
+                    html.Div([
+                        indicator(page.id('jobs-created-indicator'), 'Jobs Created'),
+                        indicator(page.id('percent-completed-indicator'), 'Completed'),
+                        indicator(page.id('percent-completed-within-sla-indicator'), 'Completed Within SLA')
+                    ], className='dashrow'),
+                    graph_row(page.id('jobs-graph'), 'Jobs'),
+                    graph_row(page.id('percent-graph'), '%'),
+                    html.Details([
+                        html.Summary('Query Description'),
+                        html.Div([
+                            html.P(
+                                f'{license} license jobs created since 1/1/2017, the % of them that were completed, and the '
+                                '% of them that were completed within SLA.'),
+                            html.P(
+                                'Completed job: job having a completed completeness check.'),
+                            html.P(
+                                'Completed job within SLA: job having a completeness check that was completed 2 days or fewer after the job was '
+                                'created. So if a job was created on Monday it would be considered within SLA if it was '
+                                'completed on Monday, Tuesday, or Wednesday, but if it was completed on Thursday or later '
+                                'it would be considered outside of SLA.')
+                        ])
+                    ])
+                ])
+
+    page.layout = update_layout
+
+    def update_graph_data(selected_start, selected_end, selected_job_type, selected_time_agg):
+        labels = TIME_AGGS[selected_time_agg]
+        df_selected = (page.rollup().aggregate(labels, {'Job Type': selected_job_type}, all_value="All",
+                                               start=selected_start, end=selected_end)
+                       .rename(columns={labels[0]: 'Date Created', labels[1]: 'DateText', 'Job ID': 'Jobs Created',
+                                        'Process Completed Day': 'Jobs Completed', 'W/in SLA': '# w/in SLA'})
+                       .sort_values(by='Date Created', ascending=False))
+        df_selected['% Completed'] = (df_selected['Jobs Completed'] / df_selected['Jobs Created'] * 100).round(0)
+        df_selected['% Completed w/in SLA'] = (df_selected['# w/in SLA'] / df_selected['Jobs Created'] * 100).round(0)
+        return df_selected
+
+    inputs = [Input(page.id('date-picker-range'), 'start_date'),
+              Input(page.id('date-picker-range'), 'end_date'),
+              Input(page.id('job-type-dropdown'), 'value')]
+
+    @app.callback(
+        [Output(page.id('jobs-created-indicator'), 'children'),
+         Output(page.id('percent-completed-indicator'), 'children'),
+         Output(page.id('percent-completed-within-sla-indicator'), 'children')],
+        inputs)
+    def update_indicators(start_date, end_date, job_type):
+        df_selected = page.filter_index().select({'Job Type': job_type}, all_value="All", start=start_date, end=end_date)
+        jobs_created = df_selected['JOBCREATEDDATEFIELD'].count()
+        percent_completed = df_selected['PROCESSDATECOMPLETEDFIELD'].count() / jobs_created * 100
+        percent_completed_within_sla = df_selected['W/in SLA'].sum() / jobs_created * 100
+        return ('{:,.0f}'.format(jobs_created),
+                '{:,.0f}%'.format(percent_completed),
+                '{:,.0f}%'.format(percent_completed_within_sla))
+
+    @app.callback(
+        [Output(page.id('jobs-graph'), 'figure'),
+         Output(page.id('percent-graph'), 'figure')],
+        inputs + [Input(page.id('time-agg-dropdown'), 'value')])
+    def update_graphs(start_date, end_date, job_type, time_agg):
+        df_results = update_graph_data(start_date, end_date, job_type, time_agg)
+        return jobs_graph(df_results), percent_graph(df_results)
+
+    return page
+
+def indicator(id, label):
+    return html.Div([
+        html.H1('', id=id, style={'font-size': '35pt'}),
+        html.H2(label, style={'font-size': '30pt'})
+    ], className='four columns', style={'text-align': 'center', 'margin': 'auto', 'padding': '50px 0'})
+
+def graph_row(id, yaxis_title):
+    return html.Div([
+        html.Div([
+            dcc.Graph(
+                id=id,
+                config={
+                    'displayModeBar': False
+                },
+                figure=go.Figure(
+                    data=[],
+                    layout=go.Layout(
+                        yaxis=dict(
+                            title=yaxis_title
+                        )
+                    )
+                )
+            )
+        ], className='twelve columns'),
+    ], className='dashrow')
+
+def line(df_results, y, color, name):
+    return go.Scatter(
+        x=df_results['Date Created'],
+        y=y,
+        mode='lines',
+        text=df_results['DateText'],
+        hoverinfo='text+y',
+        line=dict(
+            shape='spline',
+            color=color
+        ),
+        name=name
+    )
+
+def jobs_graph(df_results):
+    return {
+        'data': [
+            line(df_results, df_results['Jobs Created'], 'rgb(26, 118, 255)', 'Jobs Created'),
+            line(df_results, df_results['Jobs Completed'], '#ff7f0e', 'Jobs Completed')
+        ],
+        'layout': go.Layout(
+                xaxis=dict(
+                    title='Job Creation Date'
+                ),
+                yaxis=dict(
+                    title='Jobs',
+                    range=[0, df_results['Jobs Created'].max() + (df_results['Jobs Created'].max() / 25)]
+                )
+        )
+    }
+
+def percent_graph(df_results):
+    return {
+        'data': [
+            line(df_results, df_results['% Completed'].map('{:,.0f}%'.format), '#ff7f0e', '% of Jobs Completed'),
+            line(df_results, df_results['% Completed w/in SLA'].map('{:,.0f}%'.format), '#008000',
+                 '% of Jobs Completed w/in SLA')
+        ],
+        'layout': go.Layout(
+                xaxis=dict(
+                    title='Job Creation Date'
+                ),
+                yaxis=dict(
+                    title='% of Jobs',
+                    range=[0, 100]
+                )
+        )
+    }
@@ -1,35 +1,48 @@
 import os
-import urllib.parse
 from datetime import datetime
 
 import dash_core_components as dcc
 import dash_html_components as html
-import pandas as pd
 from dash.dependencies import Input, Output
 import dash_table_experiments as dt
-import urllib.parse
 
-from app import app, cache, cache_timeout
+from app import app, dataset_cache, frame_cache, NIGHTLY
+from utils.categoricals import categorize
+from utils.data_access import read_frame
+from utils.downloads import csv_href, xlsx_href, downloadable
+from utils.indexes import FilterIndex, presort
+from utils.paging import page, paged_table, table_columns
+from utils.records import Records
+from utils.serialization import serialize_frame
 
 APP_NAME = os.path.basename(__file__)
 
 print(APP_NAME)
 
-@cache_timeout
-@cache.memoize()
+DATASETS = {'df_ind': NIGHTLY, 'last_ddl_time': NIGHTLY}
+
+# Columns the callbacks filter on with equality, indexed by filter_index and cached as categoricals
+FILTER_COLUMNS = ['LICENSETYPE']
+# Column the callbacks filter on by date range, df_ind is presorted on it
+DATE_COLUMN = 'MOSTRECENTCCFIELD'
+
+@dataset_cache.memoize(DATASETS)
 def query_data(dataset):
     from app import con
     with con() as con:
         if dataset == 'df_ind':
             sql = 'SELECT * FROM li_dash_uninsp_bl_comp_check'
-            df = pd.read_sql_query(sql=sql, con=con, parse_dates=['MOSTRECENTCCFIELD'])
+            df = categorize(presort(read_frame(con, sql, parse_dates=['MOSTRECENTCCFIELD']), DATE_COLUMN), FILTER_COLUMNS)
         elif dataset == 'last_ddl_time':
             sql = 'SELECT SCN_TO_TIMESTAMP(MAX(ora_rowscn)) last_ddl_time FROM LI_DASH_UNINSP_BL_COMP_CHECK'
-            df = pd.read_sql_query(sql=sql, con=con)
-    return df.to_json(date_format='iso', orient='split')
+            df = read_frame(con, sql)
+    return serialize_frame(df)
 
 def dataframe(dataset):
-    return pd.read_json(query_data(dataset), orient='split')
+    return frame_cache.load(query_data, dataset)
+
+def filter_index(dataset):
+    return frame_cache.derive('filter_index', lambda df: FilterIndex(df, FILTER_COLUMNS, DATE_COLUMN), query_data, dataset)
 
 def update_layout():
     df = dataframe('df_ind')
@@ -84,6 +97,14 @@ def update_layout():
                             download='UninspectedBLsWithCompCheck_summary.csv',
                             href='',
                             target='_blank',
+                        ),
+                        ' | ',
+                        html.A(
+                            'Download Excel',
+                            id='summary-table-download-link-xlsx',
+                            download='UninspectedBLsWithCompCheck_summary.xlsx',
+                            href='',
+                            target='_blank',
                         )
                     ], style={'text-align': 'right'})
                 ], style={'margin-left': 'auto', 'margin-right': 'auto', 'float': 'none'},
@@ -92,12 +113,7 @@ def update_layout():
             html.Div([
                 html.Div([
                     html.Div([
-                        dt.DataTable(
-                            rows=[{}],
-                            filterable=True,
-                            sortable=True,
-                            id='table'
-                        )
+                        paged_table('table')
                     ]),
                     html.Div([
                         html.A(
@@ -106,6 +122,14 @@ def update_layout():
                             download='UninspectedBLsWithCompCheck.csv',
                             href='',
                             target='_blank',
+                        ),
+                        ' | ',
+                        html.A(
+                            'Download Excel',
+                            id='table-download-link-xlsx',
+                            download='UninspectedBLsWithCompCheck.xlsx',
+                            href='',
+                            target='_blank',
                         )
                     ], style={'text-align': 'right'})
                 ], style={'margin-top': '70px', 'margin-bottom': '50px',
@@ -169,14 +193,13 @@ def update_layout():
 
 layout = update_layout
 
+@downloadable
 def get_summary_data(selected_start, selected_end, selected_license_type):
-    df_selected = dataframe('df_ind')
-
-    if selected_license_type != "All":
-        df_selected = df_selected[(df_selected['LICENSETYPE'] == selected_license_type)]
+    df_selected = filter_index('df_ind').select({'LICENSETYPE': selected_license_type}, all_value="All",
+                                                start=selected_start, end=selected_end)
 
-    df_selected = (df_selected.loc[(df_selected['MOSTRECENTCCFIELD'] >= selected_start) & (df_selected['MOSTRECENTCCFIELD'] <= selected_end)]
-                   .groupby(['LICENSETYPE']).count()
+    df_selected = (df_selected
+                   .groupby(['LICENSETYPE'], observed=True).count()
                    .reset_index()
                    .rename(columns={'LICENSETYPE': 'License Type', 'LICENSENUMBER': 'Uninspected Licenses',
                                     'INSPECTIONCREATEDDATE': 'Inspections Created',
@@ -185,13 +208,12 @@ def get_summary_data(selected_start, selected_end, selected_license_type):
     return df_selected.drop(['MOSTRECENTISSUEDATE', 'MOSTRECENTCOMPLETENESSCHECK', 'MOSTRECENTCCFIELD', 'EXPIRATIONDATE', 'JOBLINK', 'INSPECTIONCOMPLETEDDATE'], axis=1)
 
 
+@downloadable
 def get_ind_records_data(selected_start, selected_end, selected_license_type):
-    df_selected = dataframe('df_ind')
+    df_selected = filter_index('df_ind').select({'LICENSETYPE': selected_license_type}, all_value="All",
+                                                start=selected_start, end=selected_end)
 
-    if selected_license_type != "All":
-        df_selected = df_selected[(df_selected['LICENSETYPE'] == selected_license_type)]
-        
-    df_selected = (df_selected.loc[(df_selected['MOSTRECENTCCFIELD'] >= selected_start) & (df_selected['MOSTRECENTCCFIELD'] <= selected_end)]
+    df_selected = (df_selected
                    .rename(columns={'LICENSENUMBER': 'License Number', 'LICENSETYPE': 'License Type',
                                     'MOSTRECENTISSUEDATE': 'Most Recent Issue Date',
                                     'MOSTRECENTCOMPLETENESSCHECK': 'Most Recent Completeness Check',
@@ -204,41 +226,33 @@ def get_ind_records_data(selected_start, selected_end, selected_license_type):
     return df_selected.drop(['MOSTRECENTCCFIELD'], axis=1)
 
 
-
-@app.callback(Output('summary-table', 'rows'),
-            [Input('completeness-check-date-range', 'start_date'),
-            Input('completeness-check-date-range', 'end_date'),
-            Input('licensetype-dropdown', 'value')])
-def update_summary_table(start_date, end_date, licensetype):
-    df_summary = get_summary_data(start_date, end_date, licensetype)
-    return df_summary.to_dict('records')
-
 @app.callback(
-            Output('summary-table-download-link', 'href'),
-            [Input('completeness-check-date-range', 'start_date'),
-            Input('completeness-check-date-range', 'end_date'),
-            Input('licensetype-dropdown', 'value')])
-def update_summary_table_download_link(start_date, end_date, licensetype):
+    [Output('summary-table', 'rows'),
+     Output('summary-table-download-link', 'href'),
+     Output('summary-table-download-link-xlsx', 'href'),
+     Output('table-download-link', 'href'),
+     Output('table-download-link-xlsx', 'href')],
+    [Input('completeness-check-date-range', 'start_date'),
+     Input('completeness-check-date-range', 'end_date'),
+     Input('licensetype-dropdown', 'value')])
+def update_page(start_date, end_date, licensetype):
     df_summary = get_summary_data(start_date, end_date, licensetype)
-    csv_string = df_summary.to_csv(index=False, encoding='utf-8')
-    csv_string = "data:text/csv;charset=utf-8," + urllib.parse.quote(csv_string)
-    return csv_string
-
-@app.callback(Output('table', 'rows'),
-            [Input('completeness-check-date-range', 'start_date'),
-            Input('completeness-check-date-range', 'end_date'),
-            Input('licensetype-dropdown', 'value')])
-def update_table(start_date, end_date, licensetype):
-    df_ind = get_ind_records_data(start_date, end_date, licensetype)
-    return df_ind.to_dict('records')
+    return (Records(df_summary),
+            csv_href(get_summary_data, start_date, end_date, licensetype, filename='UninspectedBLsWithCompCheck_summary.csv'),
+            xlsx_href(get_summary_data, start_date, end_date, licensetype, filename='UninspectedBLsWithCompCheck_summary.xlsx'),
+            csv_href(get_ind_records_data, start_date, end_date, licensetype, filename='UninspectedBLsWithCompCheck.csv'),
+            xlsx_href(get_ind_records_data, start_date, end_date, licensetype, filename='UninspectedBLsWithCompCheck.xlsx'))
+
 
 @app.callback(
-            Output('table-download-link', 'href'),
-            [Input('completeness-check-date-range', 'start_date'),
-            Input('completeness-check-date-range', 'end_date'),
-            Input('licensetype-dropdown', 'value')])
-def update_table_download_link(start_date, end_date, licensetype):
-    df_ind = get_ind_records_data(start_date, end_date, licensetype)
-    csv_string = df_ind.to_csv(index=False, encoding='utf-8')
-    csv_string = "data:text/csv;charset=utf-8," + urllib.parse.quote(csv_string)
-    return csv_string
\ No newline at end of file
+    [Output('table', 'columns'),
+     Output('table', 'data')],
+    [Input('completeness-check-date-range', 'start_date'),
+     Input('completeness-check-date-range', 'end_date'),
+     Input('licensetype-dropdown', 'value'),
+     Input('table', 'pagination_settings'),
+     Input('table', 'sorting_settings'),
+     Input('table', 'filtering_settings')])
+def update_table(start_date, end_date, licensetype, pagination_settings, sorting_settings, filtering_settings):
+    df = get_ind_records_data(start_date, end_date, licensetype)
+    return table_columns(df), page(df, pagination_settings, sorting_settings, filtering_settings)
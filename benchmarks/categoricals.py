@@ -0,0 +1,39 @@
+import click
+
+from app import con
+from benchmarks.timing import best_of
+from utils.categoricals import categorize
+from utils.data_access import read_frame
+
+# Run from the LI_dashboards base directory: python -m benchmarks.categoricals -n li_dash_indworkloads -c PERSON -c PROCESSTYPE
+
+
+def megabytes(df):
+    return df.memory_usage(index=True, deep=True).sum() / 1024 / 1024
+
+@click.command()
+@click.option('--name', '-n', default='li_dash_indworkloads', show_default=True, help='Table to read')
+@click.option('--column', '-c', multiple=True, default=['PERSON', 'PROCESSTYPE', 'JOBTYPE', 'LICENSEKIND', 'LICENSETYPE'],
+              show_default=True, help='Dimension column to make categorical')
+@click.option('--repeat', '-r', default=5, show_default=True)
+def main(name, column, repeat):
+    with con() as connection:
+        df = read_frame(connection, f'SELECT * FROM {name}')
+    categorical = categorize(df.copy(), column)
+    print(f'{name}: {len(df)} rows, {megabytes(df):.1f} MB as strings, {megabytes(categorical):.1f} MB with categoricals')
+    for dimension in column:
+        values = df[dimension].value_counts().index[:3].tolist()
+        print(f'  {dimension}: {df[dimension].nunique()} values')
+        # The operations the callbacks run on a dimension, on the strings and on the codes
+        operations = [
+            ('==', lambda frame: frame[frame[dimension] == values[0]]),
+            ('isin', lambda frame: frame[frame[dimension].isin(values)]),
+            ('groupby', lambda frame: frame.groupby(dimension, observed=True).size()),
+        ]
+        for operation, run in operations:
+            strings, _ = best_of(repeat, lambda: run(df))
+            codes, _ = best_of(repeat, lambda: run(categorical))
+            print(f'    {operation:<8} strings {strings * 1000:8.2f}ms  codes {codes * 1000:8.2f}ms  ({strings / codes:.1f}x)')
+
+if __name__ == '__main__':
+    main()
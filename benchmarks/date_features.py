@@ -0,0 +1,49 @@
+import click
+import pandas as pd
+
+from app import con
+from benchmarks.timing import best_of
+from utils.data_access import read_frame
+from utils.date_features import dates, iso_week, month_start, text, week_ending
+
+# Run from the LI_dashboards base directory: python -m benchmarks.date_features -n li_dash_expirationdates_bl -c EXPIRATIONDATE
+
+
+def year_week(series):
+    # How Man005 used to derive 'Year Week'
+    year_week_text = series.dt.strftime('%Y') + '-' + series.dt.strftime('%W') + '-0'
+    return pd.to_datetime(year_week_text, format='%Y-%W-%w').map(lambda t: t.date())
+
+# Each feature as the dashboards used to compute it per row, and from utils.date_features
+FEATURES = [
+    ('Month Year', lambda s: s.map(lambda dt: dt.date().replace(day=1)), month_start),
+    ('Week', lambda s: s.map(lambda dt: dt.week), iso_week),
+    ('Year Week', year_week, week_ending),
+    ('Day', lambda s: s.dt.date, dates),
+    ('DateText', lambda s: s.dt.strftime('%b %Y'), lambda s: text(s, '%b %Y')),
+]
+
+
+@click.command()
+@click.option('--name', '-n', default='li_dash_expirationdates_bl', show_default=True, help='Table to read')
+@click.option('--column', '-c', default='EXPIRATIONDATE', show_default=True, help='Its date column')
+@click.option('--repeat', '-r', default=3, show_default=True)
+def main(name, column, repeat):
+    with con() as connection:
+        df = read_frame(connection, f'SELECT {column} FROM {name}', parse_dates=[column])
+    # The per-row lambdas fail on missing dates
+    series = df[column].dropna()
+    print(f'{name}.{column}: {len(series)} dates, {series.dt.normalize().nunique()} distinct days')
+    for feature, per_row, vectorized in FEATURES:
+        per_row_seconds, old = best_of(repeat, lambda: per_row(series))
+        vectorized_seconds, new = best_of(repeat, lambda: vectorized(series))
+        print(f'  {feature:<12} per row {per_row_seconds:8.3f}s  by day {vectorized_seconds:8.3f}s  '
+              f'({per_row_seconds / vectorized_seconds:.1f}x)')
+        if new.dtype.kind == 'M':
+            # The days, months and weeks used to be Python dates
+            old = pd.to_datetime(old)
+        if not old.equals(new):
+            print(f'  {feature} differs')
+
+if __name__ == '__main__':
+    main()
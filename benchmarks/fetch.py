@@ -0,0 +1,31 @@
+import click
+import pandas as pd
+
+from app import con
+from benchmarks.timing import best_of
+from utils.data_access import read_frame
+
+# Run from the LI_dashboards base directory: python -m benchmarks.fetch -n li_dash_sla_bl
+
+
+@click.command()
+@click.option('--name', '-n', multiple=True, default=['li_dash_sla_bl', 'li_dash_indworkloads'], show_default=True,
+              help='Table to read in full')
+@click.option('--repeat', '-r', default=3, show_default=True)
+@click.option('--arraysize', default=None, type=int, help='Override utils.data_access.ARRAYSIZE')
+def main(name, repeat, arraysize):
+    options = {} if arraysize is None else {'arraysize': arraysize}
+    for table in name:
+        sql = f'SELECT * FROM {table}'
+        with con() as connection:
+            read_sql_seconds, df_old = best_of(repeat, lambda: pd.read_sql_query(sql=sql, con=connection))
+            read_frame_seconds, df_new = best_of(repeat, lambda: read_frame(connection, sql, **options))
+        print(f'{table}: {len(df_new)} rows, {len(df_new.columns)} columns')
+        print(f'  pd.read_sql_query  {read_sql_seconds:8.3f}s')
+        print(f'  read_frame         {read_frame_seconds:8.3f}s  ({read_sql_seconds / read_frame_seconds:.1f}x)')
+        mismatched = [column for column in df_old.columns if df_old[column].dtype != df_new[column].dtype]
+        if mismatched:
+            print('  dtypes differ: ' + ', '.join(f'{c} {df_old[c].dtype} -> {df_new[c].dtype}' for c in mismatched))
+
+if __name__ == '__main__':
+    main()
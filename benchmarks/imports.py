@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+import click
+
+# Run from the LI_dashboards base directory: python -m benchmarks.imports
+
+# Runs in a fresh interpreter each time, so every import is cold
+BOOT = '''
+import json
+import time
+start = time.perf_counter()
+import index
+boot = time.perf_counter() - start
+start = time.perf_counter()
+index.pages.load_all()
+pages = time.perf_counter() - start
+print(json.dumps({'boot': boot, 'pages': pages, 'modules': list(index.pages.import_seconds.items())}))
+'''
+
+
+def measure():
+    output = subprocess.run([sys.executable, '-c', BOOT], stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True).stdout
+    # The apps print their names as they're imported, the timings are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+@click.command()
+@click.option('--repeat', '-r', default=3, show_default=True)
+def main(repeat):
+    runs = [measure() for _ in range(repeat)]
+    best = min(runs, key=lambda run: run['boot'] + run['pages'])
+    print(f"Server ready to start: {best['boot']:.2f}s")
+    print(f"Pages loaded (in the background, before the first request): {best['pages']:.2f}s")
+    print(f"Eager imports took: {best['boot'] + best['pages']:.2f}s")
+    for module, seconds in best['modules']:
+        print(f'  {module:<45} {seconds:8.3f}s')
+    print('The first page also pays for the libraries the pages share')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import json
+
+import click
+from plotly.utils import PlotlyJSONEncoder
+
+from app import con
+from benchmarks.timing import best_of
+from utils.data_access import read_frame
+from utils.records import records_json
+
+# Run from the LI_dashboards base directory: python -m benchmarks.records -n li_dash_incompleteprocesses_bl
+
+
+@click.command()
+@click.option('--name', '-n', multiple=True, default=['li_dash_incompleteprocesses_bl', 'li_dash_uninsp_bl_comp_check'],
+              show_default=True, help='Table to encode in full')
+@click.option('--repeat', '-r', default=5, show_default=True)
+@click.option('--rows', default=None, type=int, help='Encode only the first ROWS rows, e.g. one page of a table')
+def main(name, repeat, rows):
+    for table in name:
+        with con() as connection:
+            df = read_frame(connection, f'SELECT * FROM {table}')
+        if rows is not None:
+            df = df.head(rows)
+        # What Dash did with a callback's df.to_dict('records')
+        to_dict_seconds, old = best_of(repeat, lambda: json.dumps(df.to_dict('records'), cls=PlotlyJSONEncoder))
+        records_json_seconds, new = best_of(repeat, lambda: records_json(df))
+        print(f'{table}: {len(df)} rows, {len(df.columns)} columns, {len(new) / 1024 / 1024:.1f}MB of JSON')
+        print(f'  to_dict + PlotlyJSONEncoder  {to_dict_seconds:8.3f}s')
+        print(f'  records_json                 {records_json_seconds:8.3f}s  '
+              f'({to_dict_seconds / records_json_seconds:.1f}x)')
+        if json.loads(old) != json.loads(new):
+            print('  encoded records differ')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import time
+
+
+def best_of(repeat, run):
+    # The fastest of repeat calls of run, and what the last one returned
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
@@ -6,13 +6,9 @@ from gevent.pywsgi import WSGIServer
 from flask import request
 from datetime import datetime
 
-from app import app, server
-from apps import (Man001ActiveJobsBL, Man001ActiveJobsTL, Man002ActiveProcessesBL, Man002ActiveProcessesTL,
-                  Man004BLJobVolumesBySubmissionType, Man004TLJobVolumesBySubmissionType,
-                  Man005BLExpirationDates, Man005TLExpirationDates, Man006OverdueBLInspections, IndividualWorkloads,
-                  IncompleteProcessesBL, IncompleteProcessesTL, SLA_BL, SLA_TL, ExpiringLicensesTaxIssues,
-                  UninspectedBLsWithCompCheck)
+from app import app, server, pool, layout_cache
 from config import LI_STAT_URL
+from utils.pages import PageRegistry
                   
 
 time = datetime.strftime(datetime.now(), '%I:%M %p %m/%d/%y')
@@ -57,6 +53,8 @@ def serve_layout():
                 html.Div([
                     dcc.Location(id='url', refresh=False),
                     html.Div(id='page-content'),
+                    # The count and summary tables are still dash_table_experiments tables, whose
+                    # scripts are only served if one is in the initial layout
                     html.Div(dt.DataTable(rows=[{}]), style={'display': 'none'})
                 ], className='container', style={'margin': 'auto', 'margin-bottom': '45px'}),
                 html.Nav([
@@ -73,45 +71,39 @@ def serve_layout():
 
 app.layout = serve_layout
 
+# The page shown for each URL, any other URL shows Active Jobs (Business Licenses)
+pages = PageRegistry(default='/ActiveJobsBL')
+pages.add('/ActiveJobsTL', 'apps.Man001ActiveJobsTL')
+pages.add('/ActiveJobsBL', 'apps.Man001ActiveJobsBL')
+pages.add('/ActiveProcessesBL', 'apps.Man002ActiveProcessesBL')
+pages.add('/ActiveProcessesTL', 'apps.Man002ActiveProcessesTL')
+pages.add('/JobVolumesBySubmissionTypeBL', 'apps.Man004BLJobVolumesBySubmissionType')
+pages.add('/JobVolumesBySubmissionTypeTL', 'apps.Man004TLJobVolumesBySubmissionType')
+pages.add('/ExpirationDatesBL', 'apps.Man005BLExpirationDates')
+pages.add('/ExpirationDatesTL', 'apps.Man005TLExpirationDates')
+pages.add('/OverdueInspectionsBL', 'apps.Man006OverdueBLInspections')
+pages.add('/IndividualWorkloads', 'apps.IndividualWorkloads')
+pages.add('/IncompleteProcessesBL', 'apps.IncompleteProcessesBL')
+pages.add('/IncompleteProcessesTL', 'apps.IncompleteProcessesTL')
+pages.add('/SLA_BL', 'apps.SLA_BL')
+pages.add('/SLA_TL', 'apps.SLA_TL')
+pages.add('/ExpiringLicensesTaxIssues', 'apps.ExpiringLicensesTaxIssues')
+pages.add('/UninspectedBLsWithCompCheck', 'apps.UninspectedBLsWithCompCheck')
+
+# Every page's callbacks (and downloads) are registered before a request is handled, see
+# utils.pages.PageRegistry
+server.before_request(pages.load_all)
+
 @app.callback(Output('page-content', 'children'),
               [Input('url', 'pathname')])
 def display_page(pathname):
-    if pathname == '/ActiveJobsTL':
-        return Man001ActiveJobsTL.layout()
-    elif pathname == '/ActiveJobsBL':
-        return Man001ActiveJobsBL.layout()
-    elif pathname == '/ActiveProcessesBL':
-        return Man002ActiveProcessesBL.layout()
-    elif pathname == '/ActiveProcessesTL':
-        return Man002ActiveProcessesTL.layout()
-    elif pathname == '/JobVolumesBySubmissionTypeBL':
-        return Man004BLJobVolumesBySubmissionType.layout()
-    elif pathname == '/JobVolumesBySubmissionTypeTL':
-        return Man004TLJobVolumesBySubmissionType.layout()
-    elif pathname == '/ExpirationDatesBL':
-        return Man005BLExpirationDates.layout()
-    elif pathname == '/ExpirationDatesTL':
-        return Man005TLExpirationDates.layout()
-    elif pathname == '/OverdueInspectionsBL':
-        return Man006OverdueBLInspections.layout()
-    elif pathname == '/IndividualWorkloads':
-        return IndividualWorkloads.layout()
-    elif pathname == '/IncompleteProcessesBL':
-        return IncompleteProcessesBL.layout()
-    elif pathname == '/IncompleteProcessesTL':
-        return IncompleteProcessesTL.layout()
-    elif pathname == '/SLA_BL':
-        return SLA_BL.layout()
-    elif pathname == '/SLA_TL':
-        return SLA_TL.layout()
-    elif pathname == '/ExpiringLicensesTaxIssues':
-        return ExpiringLicensesTaxIssues.layout()
-    elif pathname == '/UninspectedBLsWithCompCheck':
-        return UninspectedBLsWithCompCheck.layout()
-    else:
-        return Man001ActiveJobsBL.layout()
+    # Layouts are built once per data version, see utils.layouts.LayoutCache
+    page = pages.page(pathname)
+    return layout_cache.get(page, page.layout)
 
 if __name__ == '__main__':
+    pool.fill()
+    pages.warm()
     http_server = WSGIServer(('0.0.0.0', 8000), server)
     http_server.serve_forever()
     print('Server has loaded.')
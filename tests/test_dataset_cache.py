@@ -0,0 +1,144 @@
+import datetime
+import threading
+import time
+
+import fakeredis
+
+from utils.dataset_cache import DatasetCache, RefreshPolicy
+from utils.locks import RedisLeases
+
+POLICY = RefreshPolicy(datetime.time(6))
+
+
+class DictCache:
+    # The part of the Flask-Caching interface DatasetCache uses, in memory
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.values[key] = value
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def run_concurrently(calls):
+    results = []
+    threads = [threading.Thread(target=lambda call=call: results.append(call())) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_values_are_cached_until_their_refresh_time():
+    cache = DictCache()
+    datasets = DatasetCache(cache)
+    calls = []
+
+    def load(name):
+        calls.append(name)
+        return len(calls)
+    get = datasets.memoize({'df': POLICY})(load)
+
+    assert get('df') == 1
+    assert get('df') == 1
+    assert calls == ['df']
+    fresh_until, value = cache.get(datasets.make_key(load, ('df',)))
+    assert fresh_until == POLICY.next_refresh(datetime.datetime.now())
+
+
+def test_stale_value_is_served_while_one_caller_recomputes_it():
+    cache = DictCache()
+    datasets = DatasetCache(cache)
+    calls = []
+    recomputing = threading.Event()
+    release = threading.Event()
+
+    def load(name):
+        calls.append(name)
+        if len(calls) > 1:
+            recomputing.set()
+            release.wait(5)
+        return len(calls)
+    get = datasets.memoize(POLICY)(load)
+    key = datasets.make_key(load, ('df',))
+    version_key = datasets.version_key(load, ('df',))
+
+    assert get('df') == 1
+    cache.set(key, (datetime.datetime.now() - datetime.timedelta(seconds=1), 1))
+    assert get('df') == 1
+    recomputing.wait(5)
+    # Every caller keeps getting the stale value without waiting for the recomputation, and none
+    # starts another one
+    assert [get('df') for _ in range(5)] == [1] * 5
+    assert cache.get(version_key) is None
+
+    release.set()
+    wait_for(lambda: cache.get(version_key) is not None)
+    assert get('df') == 2
+    assert calls == ['df', 'df']
+
+
+def test_concurrent_misses_compute_once():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load(name):
+        calls.append(name)
+        started.set()
+        release.wait(5)
+        return 'value'
+    get = DatasetCache(DictCache()).memoize(POLICY)(load)
+
+    threading.Timer(0.1, release.set).start()
+    results = run_concurrently([lambda: get('df')] * 8)
+    assert results == ['value'] * 8
+    assert calls == ['df']
+
+
+def test_leases_make_computation_single_flight_across_processes():
+    # Two workers with their own DatasetCache (and so their own locks) sharing Redis
+    server = fakeredis.FakeServer()
+    cache = DictCache()
+    calls = []
+    release = threading.Event()
+
+    def load(name):
+        calls.append(name)
+        release.wait(5)
+        return 'value'
+    workers = [DatasetCache(cache, RedisLeases(fakeredis.FakeRedis(server=server), poll=0.01)).memoize(POLICY)(load)
+               for _ in range(2)]
+
+    threading.Timer(0.1, release.set).start()
+    results = run_concurrently([lambda get=get: get('df') for get in workers] * 4)
+    assert results == ['value'] * 8
+    assert calls == ['df']
+
+
+def test_refresh_overwrites_the_cached_value():
+    cache = DictCache()
+    datasets = DatasetCache(cache)
+    calls = []
+
+    def load(name):
+        calls.append(name)
+        return len(calls)
+    get = datasets.memoize(POLICY)(load)
+
+    assert get('df') == 1
+    assert get.refresh('df') == 2
+    assert get('df') == 2
+    assert get.uncached('df') == 3
+    assert get('df') == 2
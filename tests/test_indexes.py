@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.indexes import FilterIndex, presort
+
+
+def frame(n=500, seed=0):
+    r = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        'Job Type': r.choice(['Application', 'Renewal', 'Amendment'], n),
+        'License Type': pd.Categorical(r.choice(['Food', 'Rental', 'Vendor', None], n)),
+        'Count': r.randint(0, 10, n),
+        'Date': pd.Timestamp('2019-01-01') + pd.to_timedelta(r.randint(0, 90 * 86400, n), unit='s'),
+    })
+    df.loc[r.rand(n) < 0.05, 'Date'] = pd.NaT
+    return presort(df, 'Date')
+
+
+def reference(df, filters, all_value=None, start=None, end=None):
+    # The same selection as a boolean mask over the whole frame
+    mask = pd.Series(True, index=df.index)
+    for column, value in filters.items():
+        if value is None or value == all_value:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if values:
+            mask &= df[column].isin(values)
+    if start is not None:
+        mask &= (df['Date'] >= pd.Timestamp(start).normalize())
+    if end is not None:
+        mask &= (df['Date'] < pd.Timestamp(end).normalize() + pd.Timedelta(days=1))
+    return df[mask]
+
+
+@pytest.mark.parametrize('filters, start, end', [
+    ({}, None, None),
+    ({'Job Type': 'All', 'License Type': None}, None, None),
+    ({'Job Type': 'Application'}, None, None),
+    ({'Job Type': ['Application', 'Renewal'], 'License Type': 'Food'}, None, None),
+    ({'Job Type': [], 'License Type': ['Vendor', 'Unknown']}, None, None),
+    ({'Job Type': 'Unknown'}, None, None),
+    ({}, '2019-01-15', '2019-02-10'),
+    ({}, '2019-01-15T13:45:00', '2019-02-10T08:00:00'),
+    ({'License Type': 'Rental'}, '2019-02-01', None),
+    ({'Job Type': 'Renewal'}, None, '2019-01-31'),
+    ({'Job Type': 'Renewal'}, '2019-03-01', '2019-02-01'),
+])
+def test_select_matches_a_boolean_mask(filters, start, end):
+    df = frame()
+    index = FilterIndex(df, ['Job Type', 'License Type'], 'Date')
+    expected = reference(df, filters, all_value='All', start=start, end=end)
+    pd.testing.assert_frame_equal(index.select(filters, all_value='All', start=start, end=end), expected)
+    # Asked again, spelled differently, from the memoized selections
+    respelled = {column: list(reversed(value)) if isinstance(value, list) else value for column, value in filters.items()}
+    pd.testing.assert_frame_equal(index.select(respelled, all_value='All', start=start, end=end), expected)
+
+
+def test_select_without_a_date_column_ignores_the_range():
+    df = frame()
+    index = FilterIndex(df, ['Job Type'])
+    pd.testing.assert_frame_equal(index.select({'Job Type': 'Application'}, start='2019-02-01', end='2019-02-02'),
+                                  reference(df, {'Job Type': 'Application'}))
+
+
+def test_the_date_column_must_be_presorted():
+    df = frame().sort_values('Count')
+    with pytest.raises(ValueError):
+        FilterIndex(df, ['Job Type'], 'Date')
@@ -0,0 +1,79 @@
+import time
+
+import fakeredis
+import pytest
+
+from utils.locks import RedisLeases
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+def test_a_lease_is_held_by_one_worker_until_released(client):
+    leases = RedisLeases(client)
+    token = leases.acquire('df', 0)
+    assert token is not None
+    assert leases.acquire('df', 0) is None
+
+    # Only its holder can release it
+    leases.release('df', 'someone else')
+    assert leases.acquire('df', 0) is None
+    leases.release('df', token)
+    assert leases.acquire('df', 0) is not None
+
+
+def test_acquire_waits_for_the_lease(client):
+    leases = RedisLeases(client, poll=0.01)
+    leases.acquire('df', 0)
+    start = time.perf_counter()
+    assert leases.acquire('df', 0.1) is None
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_an_abandoned_lease_expires(client):
+    leases = RedisLeases(client, ttl=0.2)
+    token = leases.acquire('df', 0)
+    time.sleep(0.3)
+    other = leases.acquire('df', 0)
+    assert other is not None
+
+    # The late release of the first holder leaves the new holder's lease alone
+    leases.release('df', token)
+    assert client.get('lease/df') == other.encode()
+
+
+def test_a_held_lease_is_renewed_past_its_ttl(client):
+    leases = RedisLeases(client, ttl=0.3)
+    with leases.hold('df') as held:
+        assert held
+        time.sleep(1)
+        assert leases.acquire('df', 0) is None
+        assert client.pttl('lease/df') > 0
+    assert client.get('lease/df') is None
+
+
+def test_a_lease_taken_over_is_not_released_by_its_old_holder(client):
+    leases = RedisLeases(client, ttl=0.3)
+    with leases.hold('df'):
+        client.set('lease/df', 'other')
+    assert client.get('lease/df') == b'other'
+
+
+def test_hold_without_blocking_tries_once(client):
+    leases = RedisLeases(client)
+    with leases.hold('df'):
+        with leases.hold('df', blocking=False) as held:
+            assert not held
+
+
+def test_metrics_count_acquisitions_and_timeouts(client):
+    leases = RedisLeases(client, wait=0.05, poll=0.01)
+    with leases.hold('df'):
+        with leases.hold('df') as held:
+            assert not held
+    metrics = leases.metrics()['df']
+    assert metrics['acquired'] == 1
+    assert metrics['timeouts'] == 1
+    assert metrics['wait_seconds'] >= 0.05
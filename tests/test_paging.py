@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from utils.paging import filtered, page
+
+
+def frame():
+    return pd.DataFrame({
+        'Job Type': ['Application', 'Renewal', 'Application', 'Amendment', 'Renewal'],
+        'Person': ['Ann', 'Bob', 'anna', None, 'Cy'],
+        'Days Overdue': [999, 1234, 5, 30, None],
+        'Date': pd.to_datetime(['2019-03-01', '2019-01-15', '2019-02-01', None, '2019-01-01']),
+    })
+
+
+@pytest.mark.parametrize('settings, expected', [
+    ('', [0, 1, 2, 3, 4]),
+    ('"Job Type" eq "Application"', [0, 2]),
+    ('{Job Type} ne Application', [1, 3, 4]),
+    ('"Job Type" = Renewal', [1, 4]),
+    ('"Days Overdue" > num(30)', [0, 1]),
+    ('"Days Overdue" >= 30', [0, 1, 3]),
+    ('"Days Overdue" le num(30)', [2, 3]),
+    ('"Days Overdue" eq 999', [0]),
+    ('"Date" < 2019-02-01', [1, 4]),
+    ('Person ann', [0, 2]),
+    ('"Person" contains "AN"', [0, 2]),
+    ('"Job Type" eq Renewal && "Days Overdue" > num(1000)', [1]),
+    # Unknown columns and clauses without a value are ignored, values that aren't numbers match nothing
+    ('"Nope" eq 1', [0, 1, 2, 3, 4]),
+    ('"Job Type"', [0, 1, 2, 3, 4]),
+    ('"Days Overdue" > num(lots)', []),
+])
+def test_filtered(settings, expected):
+    assert filtered(frame(), settings).index.tolist() == expected
+
+
+def test_page_sorts_on_the_values_before_formatting():
+    df = frame()
+    rows = page(df, {'current_page': 0, 'page_size': 3}, [{'column_id': 'Days Overdue', 'direction': 'desc'}], '',
+                formats={'Days Overdue': lambda days: days.map('{:,.0f}'.format)}).df
+    assert rows['Days Overdue'].tolist() == ['1,234', '999', '30']
+    # The frame itself is left as it was
+    assert df['Days Overdue'].tolist()[:2] == [999, 1234]
+
+
+def test_page_sorts_missing_values_last():
+    rows = page(frame(), None, [{'column_id': 'Date', 'direction': 'asc'}], '').df
+    assert rows.index.tolist() == [4, 1, 2, 0, 3]
+    rows = page(frame(), None, [{'column_id': 'Date', 'direction': 'desc'}], '').df
+    assert rows.index.tolist() == [0, 2, 1, 4, 3]
+
+
+def test_page_is_cut_after_filtering():
+    df = frame()
+    rows = page(df, {'current_page': 1, 'page_size': 2}, [], '"Job Type" ne Amendment').df
+    assert rows.index.tolist() == [2, 4]
+    # Past the last page the table gets the last one
+    rows = page(df, {'current_page': 7, 'page_size': 2}, [], '').df
+    assert rows.index.tolist() == [4]
+    rows = page(df, {'current_page': 3, 'page_size': 2}, [], '"Nope" eq 1 && "Job Type" eq None').df
+    assert rows.empty
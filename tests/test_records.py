@@ -0,0 +1,31 @@
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from plotly.utils import PlotlyJSONEncoder
+
+from utils.records import records_json
+
+
+def to_dict_json(df):
+    # What Dash sends for df.to_dict('records')
+    return json.dumps(df.to_dict('records'), cls=PlotlyJSONEncoder)
+
+
+@pytest.mark.parametrize('df', [
+    pd.DataFrame({'Count': [1, -2, 3]}),
+    pd.DataFrame({'Days': [1.5, np.nan, 1e20, -0.1, np.inf]}),
+    pd.DataFrame({'Done': [True, False, True]}),
+    pd.DataFrame({'Name': ['Ann', None, 'Zoë "Z" \\', 'Ann', 'Bob\n']}),
+    pd.DataFrame({'License Type': pd.Categorical(['Food', None, 'Rental', 'Food'])}),
+    pd.DataFrame({'Expiration Date': pd.to_datetime(['2019-01-01 00:00:00', None, '2019-06-30 13:45:00'])}),
+    pd.DataFrame({'Day': [datetime.date(2019, 1, 1), None, datetime.date(2019, 12, 31)]}),
+    pd.DataFrame({'Job ID': [1, 2], 'Job Type': ['Application', 'Renewal'], 'Days Open': [0.5, np.nan],
+                  'Created': pd.to_datetime(['2019-01-01', '2019-01-02'])}),
+    pd.DataFrame({'Count': []}),
+    pd.DataFrame(index=range(3)),
+])
+def test_records_json_matches_plotly_encoding(df):
+    assert json.loads(records_json(df)) == json.loads(to_dict_json(df))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.rollups import Rollup
+
+MEASURES = {'Job ID': 'count', 'Days': 'sum'}
+
+
+def frame(n=1000, seed=0):
+    r = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        'Job ID': np.where(r.rand(n) < 0.1, np.nan, np.arange(n)),
+        'Days': r.randint(0, 20, n),
+        'Job Type': r.choice(['Application', 'Renewal'], n),
+        'License Type': pd.Categorical(r.choice(['Food', 'Rental', 'Vendor', None], n)),
+        'Date': pd.Timestamp('2019-01-01') + pd.to_timedelta(r.randint(0, 120 * 86400, n), unit='s'),
+    })
+    df.loc[r.rand(n) < 0.05, 'Date'] = pd.NaT
+    df['Month'] = df['Date'].values.astype('datetime64[M]').astype('datetime64[ns]')
+    df.loc[df['Date'].isnull(), 'Month'] = pd.NaT
+    df['Week'] = df['Date'].dt.dayofweek
+    return df
+
+
+def reference(df, by, filters, all_value=None, start=None, end=None):
+    mask = df['Date'].notnull()
+    for column, value in filters.items():
+        if value is None or value == all_value:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if values:
+            mask &= df[column].isin(values)
+    if start is not None:
+        mask &= (df['Date'] >= pd.Timestamp(start).normalize())
+    if end is not None:
+        mask &= (df['Date'] < pd.Timestamp(end).normalize() + pd.Timedelta(days=1))
+    return df[mask].groupby(by).agg(MEASURES).reset_index()
+
+
+@pytest.mark.parametrize('by, filters, start, end', [
+    (['Month'], {}, None, None),
+    (['Month', 'Week'], {'Job Type': 'All'}, None, None),
+    (['Month'], {'Job Type': 'Application', 'License Type': ['Food', 'Vendor']}, None, None),
+    (['Month'], {'License Type': 'Unknown'}, None, None),
+    (['Week'], {}, '2019-02-01', '2019-03-15'),
+    (['Month'], {'Job Type': 'Renewal'}, '2019-01-20T15:00:00', '2019-03-02T09:30:00'),
+])
+def test_aggregate_matches_groupby(by, filters, start, end):
+    df = frame()
+    rollup = Rollup(df, ['Job Type', 'License Type'], 'Date', ['Month', 'Week'], MEASURES)
+    result = rollup.aggregate(by, filters, all_value='All', start=start, end=end)
+    expected = reference(df, by, filters, all_value='All', start=start, end=end)
+    pd.testing.assert_frame_equal(result[by + list(MEASURES)], expected[by + list(MEASURES)], check_dtype=False)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_access import read_frame
+
+BUSINESS_DAYS_SQL = 'SELECT DATEOFYEAR, BUSINESSDAYSSINCE FROM business_days_since_2017'
+
+
+class BusinessDays:
+    # The city's business day calendar (business_days_since_2017) as one array of the business days
+    # elapsed by each calendar day, indexed by the day's offset from the first one. Looking up a
+    # whole column of dates is a subtraction and a take, with no merge on date objects. Days the
+    # calendar doesn't cover give NaN, like a left merge on it did.
+
+    def __init__(self, days, counts):
+        days = pd.Series(days).values.astype('datetime64[D]')
+        counts = np.asarray(counts, dtype=float)
+        valid = ~np.isnat(days)
+        days = days[valid]
+        counts = counts[valid]
+        self.origin = days.min()
+        self.counts = np.full(int((days.max() - self.origin).astype(int)) + 1, np.nan)
+        self.counts[(days - self.origin).astype(int)] = counts
+
+    def since(self, dates):
+        # Business days from the start of the calendar to each of dates, as floats
+        days = pd.Series(dates).values.astype('datetime64[D]')
+        offsets = (days - self.origin).astype('int64')
+        covered = ~np.isnat(days) & (offsets >= 0) & (offsets < len(self.counts))
+        result = np.full(len(days), np.nan)
+        result[covered] = self.counts[offsets[covered]]
+        return result
+
+    def between(self, start, end):
+        # Business days from each of start to the matching end
+        return self.since(end) - self.since(start)
+
+
+def read_business_days(con):
+    df = read_frame(con, BUSINESS_DAYS_SQL, parse_dates=['DATEOFYEAR'])
+    return BusinessDays(df['DATEOFYEAR'], df['BUSINESSDAYSSINCE'])
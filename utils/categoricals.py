@@ -0,0 +1,42 @@
+import threading
+import weakref
+
+import pandas as pd
+
+# The filter dimensions of the cached datasets (staff, process and license types, messages...) hold
+# a few hundred distinct strings over tens of thousands of rows. As categoricals each row is a small
+# integer code into one dictionary of the strings, so equality filters, isin and groupby compare
+# codes instead of Python strings and the frames take a fraction of the memory.
+
+_dictionaries = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+
+
+def categorize(df, columns):
+    # df with columns made categoricals, their categories sorted so sorting on them is unchanged.
+    # Columns that already are keep their categories. Group them with observed=True, or every
+    # combination of categories comes back as a group.
+    for column in columns:
+        if not pd.api.types.is_categorical_dtype(df[column]):
+            df[column] = pd.Categorical(df[column])
+    return df
+
+
+def share_categories(df):
+    # Point each categorical column of a decoded frame at the one dictionary of its categories this
+    # process already holds, so twin datasets (BL/TL) and successive versions with the same values
+    # keep one copy of the strings between them. Only the dictionary is swapped, the codes stay.
+    for column in df.columns:
+        values = df[column]
+        if not pd.api.types.is_categorical_dtype(values):
+            continue
+        categories = values.cat.categories
+        key = (column, values.cat.ordered, tuple(categories))
+        with _lock:
+            shared = _dictionaries.get(key)
+            if shared is None:
+                _dictionaries[key] = categories
+                continue
+        if shared is not categories:
+            df[column] = pd.Categorical.from_codes(values.cat.codes.values, shared, values.cat.ordered)
+    return df
@@ -0,0 +1,126 @@
+import dash_html_components as html
+
+from utils.categoricals import categorize
+from utils.data_access import read_frame
+from utils.downloads import downloadable
+from utils.indexes import FilterIndex, presort
+from utils.paging import table_callback
+from utils.rollups import Rollup
+from utils.serialization import serialize_frame
+
+# The dashboards that exist once per license kind (Business and Trade Licenses) are declared as specs:
+# what differs between the twins (tables, titles, ids, descriptions) in the page modules, and their
+# datasets, filters, date column and aggregations as data in the shared module of the dashboard (e.g.
+# apps.SLA), which draws the layout and registers the callbacks once for both. The data side of every
+# such page (the memoized queries, frame cache, filter indexes, rollups and downloads) is built here.
+
+
+class Dataset:
+    # A dataset of a dashboard page: the query reading it, its date columns and how the frame is
+    # prepared (renames, derived columns) before it's cached. The datasets the callbacks filter are
+    # indexed: presorted on the page's date column and their filter columns made categoricals.
+
+    def __init__(self, sql, parse_dates=(), prepare=None, indexed=False):
+        self.sql = sql
+        self.parse_dates = list(parse_dates)
+        self.prepare = prepare
+        self.indexed = indexed
+
+
+def last_ddl_time(table):
+    # When table was last loaded, for the pages' "Data last updated"
+    return Dataset(f'SELECT SCN_TO_TIMESTAMP(MAX(ora_rowscn)) last_ddl_time FROM {table.upper()}')
+
+
+class Dashboard:
+    # The data and callbacks of one dashboard page built from its spec. module is the page's module
+    # name: the queries and downloads are cached and registered under it, so each twin keeps its own
+    # keys and download links. Component ids are the page's prefix followed by their name.
+
+    def __init__(self, app, dataset_cache, frame_cache, con, module, prefix, datasets, policy,
+                 filter_columns=(), date_column=None, rollup_labels=(), rollup_measures=None):
+        self.app = app
+        self.dataset_cache = dataset_cache
+        self.frame_cache = frame_cache
+        self.con = con
+        self.module = module
+        self.prefix = prefix
+        self.datasets = datasets
+        self.filter_columns = list(filter_columns)
+        self.date_column = date_column
+        self.rollup_labels = list(rollup_labels)
+        self.rollup_measures = dict(rollup_measures or {})
+        # What warmup.py and the page module expose as DATASETS
+        self.policies = {name: policy for name in datasets}
+
+        def query_data(dataset):
+            return self._read(dataset)
+        self.query_data = self.query(self.policies)(query_data)
+
+    def id(self, name):
+        return f'{self.prefix}-{name}'
+
+    def query(self, policies):
+        # Decorator memoizing one of the page's queries in the dataset cache under the page's module.
+        # The shared modules define their queries per page, as each needs its own function.
+        def decorator(f):
+            f.__module__ = self.module
+            return self.dataset_cache.memoize(policies)(f)
+        return decorator
+
+    def downloadable(self, f):
+        # Register f for csv_href links of this page, see utils.downloads
+        f.__module__ = self.module
+        return downloadable(f)
+
+    def dataframe(self, dataset):
+        return self.frame_cache.load(self.query_data, dataset)
+
+    def filter_index(self, dataset='df_ind'):
+        date_column = self.date_column if self.datasets[dataset].indexed else None
+        return self.frame_cache.derive('filter_index', lambda df: FilterIndex(df, self.filter_columns, date_column),
+                                       self.query_data, dataset)
+
+    def rollup(self, dataset='df_ind'):
+        return self.frame_cache.derive('rollup', lambda df: Rollup(df, self.filter_columns, self.date_column,
+                                                                   self.rollup_labels, self.rollup_measures),
+                                       self.query_data, dataset)
+
+    def last_updated(self, dataset='last_ddl_time'):
+        return f"Data last updated {self.dataframe(dataset)['LAST_DDL_TIME'].iloc[0]}"
+
+    def table_callback(self, table, inputs, records, formats=None):
+        # See utils.paging.table_callback
+        return table_callback(self.app, table, inputs, records, formats)
+
+    def _read(self, dataset):
+        spec = self.datasets[dataset]
+        with self.con() as con:
+            df = read_frame(con, spec.sql, parse_dates=spec.parse_dates)
+        if spec.prepare is not None:
+            df = spec.prepare(df)
+        if spec.indexed:
+            if self.date_column is not None:
+                df = presort(df, self.date_column)
+            df = categorize(df, self.filter_columns)
+        return serialize_frame(df)
+
+
+def options(values, all_value=None):
+    # Dropdown options for the distinct values and all_value when given, sorted by label. Missing
+    # values are left out, no row matches them.
+    unsorted = [] if all_value is None else [{'label': all_value, 'value': all_value}]
+    for value in values:
+        if str(value) != 'nan':
+            unsorted.append({'label': str(value), 'value': value})
+    return sorted(unsorted, key=lambda k: k['label'])
+
+
+def download_link(id, filename, text='Download Data'):
+    return html.A(
+        text,
+        id=id,
+        download=filename,
+        href='',
+        target='_blank',
+    )
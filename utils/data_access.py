@@ -0,0 +1,102 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# Rows fetched per round trip to Oracle. The dashboard tables are read whole, so a big batch
+# saves far more in round trips than it costs in client memory.
+ARRAYSIZE = 5000
+# Most expressions Oracle takes in one IN list (ORA-01795)
+IN_LIST_LIMIT = 1000
+
+
+def read_frame(con, sql, params=None, parse_dates=(), dtypes=None, arraysize=ARRAYSIZE):
+    # Bulk replacement for pd.read_sql_query on an Oracle connection. Each fetched batch is
+    # transposed straight into per-column lists and every column is converted to its array once,
+    # rather than pandas building the frame from the list of row tuples and re-inferring types.
+    dtypes = dtypes or {}
+    cursor = con.cursor()
+    try:
+        cursor.arraysize = arraysize
+        if hasattr(cursor, 'prefetchrows'):
+            # Only on cx_Oracle 8+, older clients prefetch arraysize rows anyway
+            cursor.prefetchrows = arraysize + 1
+        cursor.execute(sql, params or {})
+        names = [column[0] for column in cursor.description]
+        columns = [[] for _ in names]
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+    finally:
+        cursor.close()
+    data = {}
+    for name, values in zip(names, columns):
+        if name in parse_dates:
+            # None becomes NaT
+            data[name] = np.array(values, dtype='datetime64[ns]')
+        elif name in dtypes:
+            data[name] = pd.Series(values, dtype=dtypes[name])
+        else:
+            data[name] = values
+    return pd.DataFrame(data, columns=names)
+
+
+def members(value):
+    # A dropdown's value (nothing, one value or a list of them) as a sorted tuple, so the same
+    # selection always makes the same cache key
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(sorted(value))
+
+
+def day(value):
+    # A date picker's value as the day it picks, so the same range always makes the same cache key
+    # whatever time of day came with it
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def day_range(start, end):
+    # A date picker's range as the times bounding the rows it selects: from midnight of the start
+    # day up to, but not including, midnight after the end day. None leaves that side open.
+    # FilterIndex, Rollup and where all cut their ranges with it, so they agree on the same rows.
+    if start is not None:
+        start = pd.Timestamp(start).normalize()
+    if end is not None:
+        end = pd.Timestamp(end).normalize() + datetime.timedelta(days=1)
+    return start, end
+
+
+def where(date_column=None, start=None, end=None, equals=None):
+    # WHERE clause and bind variables for a callback's filter values. equals maps each column to
+    # the values it may take, an empty tuple meaning no filter on it. Column names come from the
+    # code, only the values the user picked are bound.
+    clauses = []
+    params = {}
+    start, end = day_range(start, end)
+    if start is not None:
+        clauses.append(f'{date_column} >= :start_date')
+        params['start_date'] = start.to_pydatetime()
+    if end is not None:
+        clauses.append(f'{date_column} < :end_date')
+        params['end_date'] = end.to_pydatetime()
+    for column, values in (equals or {}).items():
+        if not values:
+            continue
+        names = []
+        for value in values:
+            name = f'v{len(params)}'
+            params[name] = value
+            names.append(':' + name)
+        # Longer selections are split into IN lists Oracle accepts, ORed together
+        lists = [f'{column} IN ({", ".join(names[i:i + IN_LIST_LIMIT])})' for i in range(0, len(names), IN_LIST_LIMIT)]
+        clauses.append(lists[0] if len(lists) == 1 else '(' + ' OR '.join(lists) + ')')
+    if not clauses:
+        return '', params
+    return ' WHERE ' + ' AND '.join(clauses), params
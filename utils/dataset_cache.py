@@ -0,0 +1,144 @@
+import datetime
+import threading
+import traceback
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+
+# How long a dataset's version stamp outlives its last background recomputation. Decoded copies
+# older than that were dropped at a refresh time since anyway.
+VERSION_TIMEOUT = datetime.timedelta(days=2)
+
+
+@contextmanager
+def _no_lease():
+    yield True
+
+
+class RefreshPolicy:
+    # When a dataset's source tables get reloaded. A cached value is fresh until the first refresh
+    # time after it was computed, then served stale for up to stale_for while a single caller
+    # recomputes it in the background.
+
+    def __init__(self, refresh_at, stale_for=datetime.timedelta(hours=12),
+                 warm_lead=datetime.timedelta(hours=12)):
+        self.refresh_at = refresh_at
+        self.stale_for = stale_for
+        self.warm_lead = warm_lead
+
+    def last_refresh(self, now):
+        refresh = datetime.datetime.combine(now.date(), self.refresh_at)
+        if refresh > now:
+            refresh -= datetime.timedelta(days=1)
+        return refresh
+
+    def next_refresh(self, now):
+        return self.last_refresh(now) + datetime.timedelta(days=1)
+
+    def fresh_until(self, now, warmed=False):
+        expiry = self.next_refresh(now)
+        if warmed and expiry - now <= self.warm_lead:
+            # A warm-up run shortly before the refresh time is loading the data that refresh is for
+            expiry += datetime.timedelta(days=1)
+        return expiry
+
+
+class DatasetCache:
+    # Memoizes dataset loaders in the shared cache, with the expiry of each write computed from the
+    # dataset's RefreshPolicy. Each value is stored alongside the time it stops being fresh.
+    # Recomputation is single-flight: within a process through a lock per key, and across processes
+    # through leases (utils.locks.RedisLeases) when given. A stale value recomputed in the background
+    # gets a new version stamp under version_key, for the copies decoded from the old one to miss.
+
+    def __init__(self, cache, leases=None):
+        self.cache = cache
+        self.leases = leases
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def memoize(self, policies):
+        # policies is either one RefreshPolicy for every call, or a dict mapping each dataset name
+        # (the loader's first argument) to its RefreshPolicy
+        def policy(args):
+            return policies if isinstance(policies, RefreshPolicy) else policies[args[0]]
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args):
+                return self.get(f, args, policy(args))
+
+            def refresh(*args):
+                return self.refresh(f, args, policy(args))
+
+            decorated_function.uncached = f
+            decorated_function.refresh = refresh
+            return decorated_function
+        return decorator
+
+    def get(self, f, args, policy):
+        key = self.make_key(f, args)
+        entry = self.cache.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if datetime.datetime.now() >= fresh_until:
+                self._revalidate(key, f, args, policy)
+            return value
+        with self._lock(key), self._lease(key):
+            # Another caller may have computed it while we were waiting. If the lease wait timed out
+            # the holder is presumed stuck and we compute it ourselves.
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry[1]
+            return self._compute(key, f, args, policy)
+
+    def refresh(self, f, args, policy):
+        # Recompute and overwrite in place, readers keep getting the previous value until the write
+        key = self.make_key(f, args)
+        with self._lock(key), self._lease(key):
+            return self._compute(key, f, args, policy, warmed=True)
+
+    def make_key(self, f, args):
+        return '/'.join(['dataset', f'{f.__module__}.{f.__name__}'] + [str(arg) for arg in args])
+
+    def version_key(self, f, args):
+        return 'version/' + self.make_key(f, args)
+
+    def _compute(self, key, f, args, policy, warmed=False):
+        now = datetime.datetime.now()
+        value = f(*args)
+        fresh_until = policy.fresh_until(now, warmed)
+        expires = fresh_until + policy.stale_for - datetime.datetime.now()
+        self.cache.set(key, (fresh_until, value), timeout=max(int(expires.total_seconds()), 1))
+        return value
+
+    def _revalidate(self, key, f, args, policy):
+        lock = self._lock(key)
+        if not lock.acquire(blocking=False):
+            # Already being recomputed
+            return
+
+        def run():
+            try:
+                with self._lease(key, blocking=False) as held:
+                    if not held:
+                        # Another process is already recomputing it
+                        return
+                    self._compute(key, f, args, policy)
+                    self.cache.set('version/' + key, uuid.uuid4().hex,
+                                   timeout=int(VERSION_TIMEOUT.total_seconds()))
+            except Exception:
+                traceback.print_exc()
+            finally:
+                lock.release()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _lease(self, key, blocking=True):
+        if self.leases is None:
+            return _no_lease()
+        return self.leases.hold(key, blocking=blocking)
+
+    def _lock(self, key):
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
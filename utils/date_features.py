@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# Calendar features of a dataset's datetime column. The days, months and weeks stay datetime64 (at
+# midnight), computed on the whole array, rather than columns of Python date objects. Plotly, the
+# table encoder and the downloads write them out as plain dates. The other features are computed
+# once per distinct day and looked up by the day's factorized code, instead of calling a Python
+# function on every row. Missing dates give missing features.
+
+
+def dates(series):
+    # The day of each date, like series.dt.date but datetime64
+    return _datetimes(series, series.values.astype('datetime64[D]'))
+
+
+def month_start(series):
+    # The first day of each date's month
+    return _datetimes(series, series.values.astype('datetime64[M]'))
+
+
+def iso_week(series):
+    # The ISO week number, like Timestamp.week
+    return _by_day(series, lambda day: day.isocalendar()[1])
+
+
+def week_ending(series):
+    # The Sunday closing each date's Monday to Sunday week. The same day as parsing the date's year
+    # and strftime('%W') week with weekday 0 (format='%Y-%W-%w').
+    days = series.values.astype('datetime64[D]')
+    # 1970-01-01 was a Thursday, weekday 3. NaT stays NaT whatever is added to it.
+    weekdays = (days.astype('int64') + 3) % 7
+    return _datetimes(series, days + (6 - weekdays).astype('timedelta64[D]'))
+
+
+def text(series, format):
+    # Like series.dt.strftime(format), for formats of the date alone
+    return _by_day(series, lambda day: day.strftime(format))
+
+
+def _datetimes(series, values):
+    return pd.Series(values.astype('datetime64[ns]'), index=series.index, name=series.name)
+
+
+def _by_day(series, feature):
+    days = series.values.astype('datetime64[D]').astype('datetime64[ns]')
+    codes, uniques = pd.factorize(days)
+    values = [feature(day) for day in pd.DatetimeIndex(uniques)]
+    if (codes < 0).any():
+        # Code -1 takes the missing value at the end
+        values.append(np.nan)
+    return pd.Series(pd.Series(values).values.take(codes), index=series.index, name=series.name)
@@ -0,0 +1,71 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    # Keeps database connections open between queries instead of connecting for every dataset.
+    # connect is the li_dbs factory for the database (e.g. GISLICLD.GISLICLD). At most max_size
+    # connections are open at once; idle ones are pinged before reuse once they have sat for
+    # ping_after seconds, and every call made on a connection is cut off after call_timeout seconds.
+
+    def __init__(self, connect, min_size=1, max_size=8, acquire_timeout=60, call_timeout=None, ping_after=60):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.call_timeout = call_timeout
+        self.ping_after = ping_after
+        # Most recently used first, so the connections that are kept busy stay warm
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def fill(self):
+        # Open min_size connections up front so the first page loads don't pay for them
+        opened = [self._open() for _ in range(max(self.min_size - self._idle.qsize(), 0))]
+        for conn in opened:
+            self._idle.put((time.monotonic(), conn))
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f'No database connection free after {self.acquire_timeout} seconds')
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            except Exception:
+                # The connection may be what failed, don't hand it to anyone else
+                self._close(conn)
+                raise
+            else:
+                self._idle.put((time.monotonic(), conn))
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        while True:
+            try:
+                last_used, conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if time.monotonic() - last_used < self.ping_after:
+                return conn
+            try:
+                conn.ping()
+                return conn
+            except Exception:
+                self._close(conn)
+
+    def _open(self):
+        conn = self.connect()
+        if self.call_timeout is not None:
+            conn.callTimeout = int(self.call_timeout * 1000)
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
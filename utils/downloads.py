@@ -0,0 +1,104 @@
+import tempfile
+import urllib.parse
+import zlib
+from inspect import signature
+
+import xlsxwriter
+from flask import Response, abort, request
+
+# Rows encoded per chunk of a streamed download
+CHUNK_ROWS = 10000
+# Bytes per read of a finished XLSX file
+CHUNK_BYTES = 64 * 1024
+
+DOWNLOADS = {}
+
+
+def downloadable(f):
+    # Register a function returning a DataFrame, so csv_href links can download its result
+    DOWNLOADS[f'{f.__module__}.{f.__name__}'] = f
+    return f
+
+
+def csv_href(f, *args, filename):
+    # Link to f(*args) as the CSV file filename, the name the page's html.A sets as download. Only the
+    # arguments go in the link, the file is built by download when the link is followed.
+    return _href(f, filename, args)
+
+
+def xlsx_href(f, *args, filename):
+    return _href(f, filename, args)
+
+
+def download(name, filename):
+    # View for csv_href and xlsx_href links, streams the frame chunk by chunk
+    f = DOWNLOADS.get(name)
+    extension = filename.rsplit('.', 1)[-1]
+    if f is None or extension not in ('csv', 'xlsx'):
+        abort(404)
+    args = []
+    for param in signature(f).parameters:
+        values = request.args.getlist(param)
+        args.append(None if not values else values[0] if len(values) == 1 else values)
+    df = f(*args)
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"',
+               'Vary': 'Accept-Encoding'}
+    if extension == 'xlsx':
+        # Already a zip archive, not worth compressing again
+        chunks = xlsx_chunks(df)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        chunks = csv_chunks(df)
+        mimetype = 'text/csv'
+        if 'gzip' in request.accept_encodings:
+            chunks = gzip_chunks(chunks)
+            headers['Content-Encoding'] = 'gzip'
+    return Response(chunks, headers=headers, mimetype=mimetype)
+
+
+def csv_chunks(df):
+    yield df.iloc[:0].to_csv(index=False)
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield df.iloc[start:start + CHUNK_ROWS].to_csv(index=False, header=False)
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def xlsx_chunks(df):
+    # In constant_memory mode xlsxwriter flushes each row to disk as soon as the next one starts, and
+    # the finished workbook is read back from a temporary file, so neither is held in memory
+    with tempfile.TemporaryFile() as f:
+        workbook = xlsxwriter.Workbook(f, {'constant_memory': True, 'default_date_format': 'mm/dd/yyyy',
+                                           'strings_to_formulas': False, 'strings_to_urls': False})
+        worksheet = workbook.add_worksheet()
+        worksheet.write_row(0, 0, [str(column) for column in df.columns])
+        row = 1
+        for start in range(0, len(df), CHUNK_ROWS):
+            chunk = df.iloc[start:start + CHUNK_ROWS]
+            # Python values, with blanks for NaN and NaT
+            chunk = chunk.astype(object).where(chunk.notnull(), None)
+            for values in chunk.itertuples(index=False):
+                worksheet.write_row(row, 0, values)
+                row += 1
+        workbook.close()
+        f.seek(0)
+        yield from iter(lambda: f.read(CHUNK_BYTES), b'')
+
+
+def _href(f, filename, args):
+    params = []
+    for name, value in zip(signature(f).parameters, args):
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            params.extend((name, item) for item in value)
+        else:
+            params.append((name, value))
+    return f'/download/{f.__module__}.{f.__name__}/{urllib.parse.quote(filename)}?' + urllib.parse.urlencode(params)
@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+
+from utils.categoricals import share_categories
+from utils.serialization import deserialize_frame
+
+
+class FrameCache:
+    # Per-process LRU of decoded DataFrames sitting in front of the shared Redis cache. Entries are
+    # keyed by the loader and its arguments and tagged with the version of that dataset they were
+    # decoded under (version(query, args)), so a version change (new day's ETL, explicit
+    # invalidation, the dataset recomputed) makes them miss.
+    # Frames handed out are shared between callbacks and must be treated as read-only. Their
+    # categoricals share dictionaries with the other frames of the process (see share_categories).
+
+    def __init__(self, max_bytes, version):
+        self.max_bytes = max_bytes
+        self.version = version
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, df):
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (version, df, nbytes, {})
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def load(self, query, *args):
+        key = (query.__module__, query.__name__) + args
+        version = self.version(query, args)
+        df = self.get(key, version)
+        if df is None:
+            df = share_categories(deserialize_frame(query(*args)))
+            self.put(key, version, df)
+        return df
+
+    def derive(self, name, build, query, *args):
+        # Something computed from a cached frame (e.g. a utils.indexes.FilterIndex), built once and
+        # kept for as long as the frame itself
+        df = self.load(query, *args)
+        key = (query.__module__, query.__name__) + args
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is df and name in entry[3]:
+                self._entries.move_to_end(key)
+                return entry[3][name]
+        derived = build(df)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is df:
+                if name in entry[3]:
+                    # Another thread built it first
+                    return entry[3][name]
+                entry[3][name] = derived
+                nbytes = getattr(derived, 'nbytes', 0)
+                self._entries[key] = (entry[0], df, entry[2] + nbytes, entry[3])
+                self.size += nbytes
+        return derived
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _discard(self, key):
+        self.size -= self._entries.pop(key)[2]
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_access import day_range
+
+_NO_ROWS = np.array([], dtype=np.intp)
+
+# Distinct selections remembered per FilterIndex, a page's callbacks all ask for the latest one
+SELECTIONS = 16
+
+
+class FilterIndex:
+    # Row positions of every distinct value of the filterable columns of a cached dataset, so a set
+    # of equality filters is an intersection of sorted position arrays instead of one boolean scan
+    # of the whole frame per filter. Built once per dataset version through FrameCache.derive.
+    # Datasets presorted on date_column (see presort) also get their date range cut by binary search.
+    # The rows of the latest selections are memoized, so the callbacks of every output a change of
+    # the page's inputs redraws share one lookup.
+
+    def __init__(self, df, columns, date_column=None):
+        self.df = df
+        self.dates = None
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+        if date_column is not None:
+            dates = df[date_column]
+            # presort puts the missing dates last, they never match a range
+            valid = len(dates) - int(dates.isnull().sum())
+            if not dates.iloc[:valid].is_monotonic_increasing:
+                raise ValueError(f'{date_column} must be presorted to index it')
+            self.dates = dates.values[:valid]
+        self.positions = {}
+        for column in columns:
+            codes, uniques = pd.factorize(df[column])
+            # A stable sort keeps the positions of each value in ascending order
+            order = np.argsort(codes, kind='mergesort')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.positions[column] = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+        self.nbytes = sum(rows.nbytes for values in self.positions.values() for rows in values.values())
+
+    def lookup(self, filters, all_value=None):
+        # filters maps columns to a value or a list of values. None, an empty list or all_value
+        # means no filter on that column. Returns the matching row positions in ascending order, or
+        # None when nothing is filtered.
+        selected = []
+        for column, value in filters.items():
+            if value is None or value == all_value:
+                continue
+            if isinstance(value, (list, tuple)):
+                if not value:
+                    continue
+                values = self.positions[column]
+                selected.append(np.unique(np.concatenate([values.get(v, _NO_ROWS) for v in value])))
+            else:
+                selected.append(self.positions[column].get(value, _NO_ROWS))
+        if not selected:
+            return None
+        # Start from the most selective filter so every intersection is as small as possible
+        selected.sort(key=len)
+        rows = selected[0]
+        for other in selected[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def date_bounds(self, start, end):
+        # Positions [lo, hi) of the rows from the start day through the whole of the end day
+        start, end = day_range(start, end)
+        lo = 0
+        hi = len(self.dates)
+        if start is not None:
+            lo = np.searchsorted(self.dates, np.datetime64(start), side='left')
+        if end is not None:
+            hi = np.searchsorted(self.dates, np.datetime64(end), side='left')
+        return lo, max(lo, hi)
+
+    def rows(self, filters, all_value=None, start=None, end=None):
+        # The rows matching filters (see lookup) and, for an indexed date column, the date range: None
+        # when nothing is filtered, a slice for a date range alone, otherwise ascending positions
+        key = self._selection_key(filters, all_value, start, end)
+        with self._lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+        columns, start, end = key
+        rows = self.lookup(dict(columns))
+        if self.dates is not None and (start is not None or end is not None):
+            lo, hi = self.date_bounds(start, end)
+            if rows is None:
+                rows = slice(lo, hi)
+            else:
+                rows = rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)]
+        with self._lock:
+            self._selections[key] = rows
+            while len(self._selections) > SELECTIONS:
+                self._selections.popitem(last=False)
+        return rows
+
+    def select(self, filters, all_value=None, start=None, end=None):
+        # The selected rows of the frame (see rows), or the cached frame itself when nothing is
+        # filtered. Selections may share their data with the cached frame, callers modifying one in
+        # place copy it first.
+        rows = self.rows(filters, all_value, start, end)
+        if rows is None:
+            return self.df
+        return self.df.iloc[rows]
+
+    def _selection_key(self, filters, all_value, start, end):
+        # The same selection however the callback spelled it: one value or a list of them, the
+        # columns in any order and any time of the start and end days
+        columns = []
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple)):
+                values = tuple(sorted(set(value), key=str))
+            elif value is None or value == all_value:
+                values = ()
+            else:
+                values = (value,)
+            if values:
+                columns.append((column, values))
+        if self.dates is None:
+            start = end = None
+        if start is not None:
+            start = pd.Timestamp(start).normalize()
+        if end is not None:
+            end = pd.Timestamp(end).normalize()
+        return tuple(sorted(columns)), start, end
+
+
+def presort(df, date_column):
+    # Order a dataset by its primary date column before it's cached, so FilterIndex can cut date
+    # ranges as contiguous slices
+    return df.sort_values(by=date_column, kind='mergesort', na_position='last').reset_index(drop=True)
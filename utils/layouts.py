@@ -0,0 +1,33 @@
+import datetime
+import threading
+
+
+class LayoutCache:
+    # Per-process cache of the dashboards' page layouts. Building one loads the page's datasets,
+    # scans them for the dropdown options and draws the initial figures, so each page is built once
+    # per version of its data (version(page)) and every later navigation to it returns the same
+    # component tree. The day is part of the version too, as date pickers start or end today.
+    # Layouts handed out are shared between requests and must be treated as read-only.
+
+    def __init__(self, version):
+        self.version = version
+        self._layouts = {}
+        self._lock = threading.Lock()
+
+    def get(self, page, build):
+        # page is the page's apps module
+        version = (self.version(page), datetime.date.today())
+        with self._lock:
+            entry = self._layouts.get(page.__name__)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+        # Built outside the lock, pages don't wait on each other. The version read before building
+        # keeps a layout of data replaced meanwhile from being served as the new one.
+        layout = build()
+        with self._lock:
+            self._layouts[page.__name__] = (version, layout)
+        return layout
+
+    def clear(self):
+        with self._lock:
+            self._layouts.clear()
@@ -0,0 +1,102 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Only delete the lease if we still own it, it may have expired and been taken by another worker
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Likewise only extend the lease if we still own it
+_RENEW = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class RedisLeases:
+    # Leases shared by every worker process through Redis, so one of them rebuilds a dataset while the
+    # others wait for it. The holder renews its lease every ttl / 3 seconds for as long as it works,
+    # however long the queries take, and a lease expires ttl seconds after its last renewal in case
+    # its holder dies mid-query. Wait and hold times are accumulated per lease name in a Redis hash.
+
+    def __init__(self, client, ttl=60, wait=900, poll=0.1, prefix='lease/', metrics_key='lease_metrics'):
+        self.client = client
+        self.ttl = ttl
+        self.wait = wait
+        self.poll = poll
+        self.prefix = prefix
+        self.metrics_key = metrics_key
+        self._release = client.register_script(_RELEASE)
+        self._renew = client.register_script(_RENEW)
+
+    def acquire(self, name, timeout):
+        token = uuid.uuid4().hex
+        deadline = time.perf_counter() + timeout
+        while not self.client.set(self.prefix + name, token, nx=True, px=int(self.ttl * 1000)):
+            if time.perf_counter() >= deadline:
+                return None
+            time.sleep(self.poll)
+        return token
+
+    def release(self, name, token):
+        self._release(keys=[self.prefix + name], args=[token])
+
+    @contextmanager
+    def hold(self, name, blocking=True):
+        # Yields whether the lease was acquired; without blocking it is only tried once
+        start = time.perf_counter()
+        token = self.acquire(name, self.wait if blocking else 0)
+        acquired_at = time.perf_counter()
+        renewing = self._keep_renewed(name, token) if token is not None else None
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                renewing.set()
+                self.release(name, token)
+                self._record(name, acquired_at - start, time.perf_counter() - acquired_at)
+            elif blocking:
+                self._record(name, acquired_at - start, None)
+
+    def _keep_renewed(self, name, token):
+        # Renews the lease from a thread of its own, the holder is busy in a query. Stops once the
+        # returned event is set.
+        done = threading.Event()
+
+        def run():
+            while not done.wait(self.ttl / 3):
+                if not self._renew(keys=[self.prefix + name], args=[token, int(self.ttl * 1000)]):
+                    # Expired and taken by another worker, it isn't ours to renew anymore
+                    return
+
+        threading.Thread(target=run, name=f'lease-renewal {name}', daemon=True).start()
+        return done
+
+    def _record(self, name, waited, held):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrbyfloat(self.metrics_key, f'{name}:wait_seconds', waited)
+        if held is None:
+            pipe.hincrby(self.metrics_key, f'{name}:timeouts', 1)
+        else:
+            pipe.hincrby(self.metrics_key, f'{name}:acquired', 1)
+            pipe.hincrbyfloat(self.metrics_key, f'{name}:hold_seconds', held)
+        pipe.execute()
+
+    def metrics(self):
+        stats = {}
+        for field, value in self.client.hgetall(self.metrics_key).items():
+            name, stat = field.decode().rsplit(':', 1)
+            stats.setdefault(name, {'acquired': 0, 'timeouts': 0, 'wait_seconds': 0.0, 'hold_seconds': 0.0})
+            stats[name][stat] = float(value) if stat.endswith('seconds') else int(value)
+        for stat in stats.values():
+            waits = stat['acquired'] + stat['timeouts']
+            stat['avg_wait_seconds'] = stat['wait_seconds'] / waits if waits else 0.0
+            stat['avg_hold_seconds'] = stat['hold_seconds'] / stat['acquired'] if stat['acquired'] else 0.0
+        return stats
@@ -0,0 +1,53 @@
+import importlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class PageRegistry:
+    # The dashboard pages by URL path, as the names of their apps modules. The modules are imported
+    # when first needed rather than when the server starts: each one imports plotly's graph objects
+    # and the table components and registers its callbacks, which is most of a worker's boot.
+    # Dash sends the browser every callback of the app with the first page and routes callback
+    # requests through its callback map, so all pages have to be registered before anything is
+    # served. load_all (run before each request) blocks until they are, and warm starts on it in the
+    # background as soon as the worker is up.
+
+    def __init__(self, default):
+        self.default = default
+        self.routes = OrderedDict()
+        # Seconds each module took to import. The first one also pays for the libraries the pages
+        # share that the server hadn't imported yet.
+        self.import_seconds = OrderedDict()
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def add(self, path, module):
+        self.routes[path] = module
+
+    def page(self, path):
+        # The module of the page at path, any other path shows the default page
+        return self._import(self.routes.get(path, self.routes[self.default]))
+
+    def load_all(self):
+        if self._loaded:
+            return
+        with self._lock:
+            for module in self.routes.values():
+                self._import(module)
+            self._loaded = True
+
+    def warm(self):
+        thread = threading.Thread(target=self.load_all, name='page-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def _import(self, module):
+        with self._lock:
+            if module in sys.modules:
+                return sys.modules[module]
+            start = time.perf_counter()
+            imported = importlib.import_module(module)
+            self.import_seconds[module] = time.perf_counter() - start
+            return imported
@@ -0,0 +1,122 @@
+import re
+
+import dash_table
+from dash.dependencies import Input, Output
+import numpy as np
+import pandas as pd
+
+from utils.records import Records
+
+# Rows of a record table sent to the browser at a time
+PAGE_SIZE = 50
+
+# One clause of a table's filtering_settings, e.g. "Job Type" eq "Renewal" or "Days Overdue" > num(30).
+# A clause typed without an operator is a search for the value.
+_CLAUSE = re.compile(r'^\s*(?:"(?P<quoted>[^"]+)"|\{(?P<braced>[^}]+)\}|(?P<bare>\S+))'
+                     r'\s*(?:(?P<op>eq|ne|lt|le|gt|ge|contains)\s+|(?P<symbol>!=|>=|<=|=|>|<)\s*)?(?P<value>.*?)\s*$')
+_NUM = re.compile(r'^num\((.*)\)$')
+_COMPARISONS = {'eq': '__eq__', '=': '__eq__', 'ne': '__ne__', '!=': '__ne__',
+                'lt': '__lt__', '<': '__lt__', 'le': '__le__', '<=': '__le__',
+                'gt': '__gt__', '>': '__gt__', 'ge': '__ge__', '>=': '__ge__'}
+
+
+def paged_table(id, page_size=PAGE_SIZE):
+    # A record table whose paging, sorting and filtering are all done by a callback through page,
+    # so only the visible page of the frame is ever sent to the browser
+    return dash_table.DataTable(
+        id=id,
+        columns=[],
+        data=[],
+        pagination_mode='be',
+        pagination_settings={'current_page': 0, 'page_size': page_size},
+        sorting='be',
+        sorting_type='single',
+        sorting_settings=[],
+        filtering='be',
+        filtering_settings='',
+        style_table={'overflowX': 'auto'}
+    )
+
+
+def table_callback(app, table, inputs, records, formats=None):
+    # Register the callback of a paged_table: records(*values of inputs) is the frame it shows,
+    # paged, sorted and filtered by the table's own settings. formats as for page.
+    @app.callback(
+        [Output(table, 'columns'),
+         Output(table, 'data')],
+        inputs + [Input(table, 'pagination_settings'),
+                  Input(table, 'sorting_settings'),
+                  Input(table, 'filtering_settings')])
+    def update_table(*values):
+        df = records(*values[:-3])
+        return table_columns(df), page(df, *values[-3:], formats=formats)
+    return update_table
+
+
+def table_columns(df):
+    return [{'name': str(column), 'id': str(column)} for column in df.columns]
+
+
+def page(df, pagination_settings, sorting_settings, filtering_settings, formats=None):
+    # The page of df a paged_table is showing, after its filters and sort. formats maps columns to
+    # a function formatting their values for display, applied to the rows of the page alone so the
+    # filters and sort work on the values themselves (e.g. dates in date order).
+    df = filtered(df, filtering_settings)
+    if sorting_settings:
+        df = df.sort_values(by=[setting['column_id'] for setting in sorting_settings],
+                            ascending=[setting['direction'] == 'asc' for setting in sorting_settings],
+                            kind='mergesort', na_position='last')
+    pagination_settings = pagination_settings or {}
+    page_size = pagination_settings.get('page_size') or PAGE_SIZE
+    # The table doesn't know how many pages there are, past the last one it gets the last one
+    last_page = max(len(df) - 1, 0) // page_size
+    current_page = min(pagination_settings.get('current_page') or 0, last_page)
+    rows = df.iloc[current_page * page_size:(current_page + 1) * page_size]
+    if formats:
+        rows = rows.assign(**{column: format(rows[column]) for column, format in formats.items()})
+    return Records(rows)
+
+
+def filtered(df, filtering_settings):
+    # The rows of df matching every clause of filtering_settings. Clauses on unknown columns or that
+    # can't be parsed are ignored, like the table itself does.
+    if not filtering_settings:
+        return df
+    mask = None
+    for clause in filtering_settings.split('&&'):
+        match = _CLAUSE.match(clause)
+        if match is None or not match.group('value'):
+            continue
+        column = match.group('quoted') or match.group('braced') or match.group('bare')
+        if column not in df.columns:
+            continue
+        op = match.group('op') or match.group('symbol') or 'contains'
+        clause_mask = _matches(df[column], op, _literal(match.group('value')))
+        mask = clause_mask if mask is None else mask & clause_mask
+    if mask is None:
+        return df
+    return df[mask]
+
+
+def _literal(value):
+    num = _NUM.match(value)
+    if num is not None:
+        value = num.group(1).strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        value = value[1:-1]
+    return value
+
+
+def _matches(series, op, value):
+    if op == 'contains':
+        return series.astype(str).str.contains(value, case=False, regex=False)
+    if pd.api.types.is_numeric_dtype(series):
+        value = pd.to_numeric(value, errors='coerce')
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        value = pd.to_datetime(value, errors='coerce')
+    else:
+        series = series.astype(str)
+    if pd.isnull(value):
+        # Not a number or date, so nothing compares to it
+        return pd.Series(np.zeros(len(series), dtype=bool), index=series.index)
+    return getattr(series, _COMPARISONS[op])(value)
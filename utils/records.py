@@ -0,0 +1,78 @@
+import json
+import re
+from json.encoder import encode_basestring_ascii
+
+import dash
+import flask
+import numpy as np
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+# Stands in for a Records in the callback response until RecordsDash splices its JSON in. A NUL
+# can't come from any input of the dashboards.
+_PLACEHOLDER = '\x00records:'
+_ENCODED_PLACEHOLDER = re.compile(re.escape(json.dumps(_PLACEHOLDER)[:-1]) + r'(\d+)"')
+
+_encoder = PlotlyJSONEncoder()
+
+
+class Records:
+    # A DataFrame returned from a callback as its list of row dicts, for a table's rows or data.
+    # Dash would call to_dict('records') and encode every row, then PlotlyJSONEncoder parses and
+    # dumps the whole response a second time. Instead the frame is encoded a column at a time by
+    # records_json and written into the response as is.
+
+    def __init__(self, df):
+        self.df = df
+
+    def to_plotly_json(self):
+        records = flask.g.setdefault('records', [])
+        records.append(self.df)
+        return f'{_PLACEHOLDER}{len(records) - 1}'
+
+
+class RecordsDash(dash.Dash):
+    # Dash app whose callbacks may return Records
+
+    def dispatch(self):
+        flask.g.records = []
+        response = super().dispatch()
+        if flask.g.records:
+            data = response.get_data(as_text=True)
+            response.set_data(_ENCODED_PLACEHOLDER.sub(lambda match: records_json(flask.g.records[int(match.group(1))]),
+                                                       data))
+        return response
+
+
+def records_json(df):
+    # The JSON of df.to_dict('records') as PlotlyJSONEncoder writes it, built from the column arrays.
+    # Numbers are formatted column by column, any other column is factorized and only its distinct
+    # values are encoded, then each row is joined from its columns' fragments.
+    columns = []
+    for name in df.columns:
+        key = encode_basestring_ascii(str(name)) + ':'
+        columns.append([key + value for value in _column_json(df[name])])
+    return '[' + ','.join('{' + ','.join(row) + '}' for row in zip(*columns)) + ']'
+
+
+def _column_json(series):
+    values = series.values
+    if series.dtype == bool:
+        return np.where(values, 'true', 'false').tolist()
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return [str(value) for value in values.tolist()]
+    if pd.api.types.is_float_dtype(series.dtype):
+        text = np.array([repr(value) for value in values.tolist()], dtype=object)
+        # NaN and the infinities aren't JSON, PlotlyJSONEncoder writes them as null
+        text[~np.isfinite(values)] = 'null'
+        return text.tolist()
+    codes, uniques = pd.factorize(series)
+    text = np.array([_value_json(value) for value in uniques] + ['null'], dtype=object)
+    # Missing values have code -1, the null at the end
+    return text[codes].tolist()
+
+
+def _value_json(value):
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    return _encoder.encode(value)
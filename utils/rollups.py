@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_access import day_range
+
+_DAY = '__day'
+
+
+class Rollup:
+    # Counts and sums of a cached dataset pre-aggregated per day and combination of its filter
+    # dimensions, for the graphs. A graph's filters and date range select rows of this cube, which
+    # are summed up to its time buckets, so the row-level data is never grouped per callback. Built
+    # once per dataset version through FrameCache.derive.
+    # labels are the columns a graph groups by, e.g. 'Month Year', and must be the same for every
+    # row of a day. measures maps columns to 'count' (of non-missing values) or 'sum', as for agg.
+
+    def __init__(self, df, dimensions, date_column, labels, measures):
+        df = df[df[date_column].notnull()]
+        self.dimensions = list(dimensions)
+        self.measures = dict(measures)
+        keys = {}
+        self.codes = {}
+        for dimension in self.dimensions:
+            # Grouping on the codes keeps the rows whose dimension is missing, as they count when
+            # nothing is filtered
+            codes, uniques = pd.factorize(df[dimension])
+            keys[dimension] = codes
+            self.codes[dimension] = {value: code for code, value in enumerate(uniques)}
+        keys[_DAY] = df[date_column].values.astype('datetime64[D]').astype('datetime64[ns]')
+        cube = pd.DataFrame(keys, index=df.index)
+        for column, how in self.measures.items():
+            cube[column] = df[column].notnull().astype('int64') if how == 'count' else df[column]
+        self.cube = (cube.groupby(self.dimensions + [_DAY]).sum()
+                     .reset_index()
+                     .sort_values(_DAY, kind='mergesort')
+                     .reset_index(drop=True))
+        self.days = self.cube[_DAY].values
+        self.labels = df.groupby(keys[_DAY])[list(labels)].first()
+        self.nbytes = int(self.cube.memory_usage(index=True).sum())
+
+    def aggregate(self, by, filters, all_value=None, start=None, end=None):
+        # Like df.groupby(by).agg(measures).reset_index() on the rows filters and the date range
+        # select, with the same filter values and date range (see utils.data_access.day_range) as
+        # FilterIndex.select
+        start, end = day_range(start, end)
+        lo = 0
+        hi = len(self.days)
+        if start is not None:
+            lo = np.searchsorted(self.days, np.datetime64(start), side='left')
+        if end is not None:
+            hi = np.searchsorted(self.days, np.datetime64(end), side='left')
+        cube = self.cube.iloc[lo:max(lo, hi)]
+        mask = np.ones(len(cube), dtype=bool)
+        for dimension, value in filters.items():
+            if value is None or value == all_value:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            if not values:
+                continue
+            codes = [self.codes[dimension][v] for v in values if v in self.codes[dimension]]
+            mask &= np.isin(cube[dimension].values, codes)
+        cube = cube[mask]
+        labels = self.labels.reindex(cube[_DAY].values)
+        labels.index = cube.index
+        return (pd.concat([labels[list(by)], cube[list(self.measures)]], axis=1)
+                .groupby(list(by)).sum()
+                .reset_index())
@@ -0,0 +1,22 @@
+import pickle
+
+# Cached datasets are stored in Redis as pickled pandas blocks rather than JSON. Each block is a
+# contiguous typed array, so categoricals, datetimes and Python date columns come back exactly as
+# they were written and decoding is a memcpy rather than a full JSON parse.
+
+MAGIC = b'LIDF'
+FORMAT_VERSION = 1
+
+
+def serialize_frame(df):
+    return MAGIC + bytes([FORMAT_VERSION]) + pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize_frame(payload):
+    if not isinstance(payload, bytes) or payload[:len(MAGIC)] != MAGIC:
+        # Values cached by older versions of the dashboards were JSON strings
+        raise ValueError('Unrecognised cached frame payload, flush the Redis cache')
+    version = payload[len(MAGIC)]
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported cached frame format version {version}')
+    return pickle.loads(payload[len(MAGIC) + 1:])
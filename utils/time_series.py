@@ -0,0 +1,30 @@
+import pandas as pd
+
+# Complete axes for the graphs, so the buckets a selection has no rows in show as zero instead of
+# being left out of the line
+
+
+def month_starts(start, end):
+    # The first day of each month from the day of start through the day of end, like
+    # utils.date_features.month_start
+    return pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq='MS', normalize=True)
+
+
+def week_endings(start, end):
+    # The Sundays ending the weeks from the day of start through the day of end (see
+    # utils.date_features.week_ending)
+    return pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq='W-SUN', normalize=True)
+
+
+def fill_missing(df, column, index, defaults):
+    # df with a row added for each value of index that column doesn't have, all in one concat.
+    # defaults gives the added rows' other columns, each a constant or a function of the missing
+    # value. Columns without a default are left missing.
+    index = pd.Series(list(index))
+    missing = index[~index.isin(df[column])]
+    if missing.empty:
+        return df
+    added = pd.DataFrame({column: missing.values})
+    for name, default in defaults.items():
+        added[name] = [default(value) for value in missing] if callable(default) else default
+    return pd.concat([df, added.reindex(columns=df.columns)], ignore_index=True)
@@ -0,0 +1,83 @@
+import datetime
+import importlib
+import os
+import pkgutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+
+from app import bump_data_version
+from utils.serialization import deserialize_frame
+
+APPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'apps')
+
+
+def discover(names=()):
+    # Every apps module that loads its data through a memoized query_data declares the datasets it can load
+    # in DATASETS
+    jobs = []
+    for module_info in sorted(pkgutil.iter_modules([APPS_DIR]), key=lambda m: m.name):
+        if names and module_info.name not in names:
+            continue
+        module = importlib.import_module('apps.' + module_info.name)
+        if not hasattr(module, 'query_data'):
+            continue
+        for dataset in getattr(module, 'DATASETS', []):
+            jobs.append((module_info.name, module.query_data, dataset))
+    return jobs
+
+def warm(query, dataset):
+    # Recompute and overwrite the cached value in place, so readers keep getting yesterday's data
+    # until the new value is written and never see a cold key
+    start = time.perf_counter()
+    payload = query.refresh(dataset)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(deserialize_frame(payload))
+
+def run(names, workers):
+    jobs = discover(names)
+    if not jobs:
+        print('No datasets found to warm')
+        return 0
+    print(f'Warming {len(jobs)} datasets with {workers} workers')
+    start = time.perf_counter()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(warm, query, dataset): (name, dataset) for name, query, dataset in jobs}
+        for future in as_completed(futures):
+            name, dataset = futures[future]
+            try:
+                elapsed, rows = future.result()
+            except Exception as e:
+                failures += 1
+                print(f'{name} {dataset}: FAILED {e!r}')
+            else:
+                print(f'{name} {dataset}: {elapsed:.2f}s, {rows} rows')
+    # Have every worker's in-process frame cache re-read the freshly written values
+    bump_data_version()
+    print(f'Warmed {len(jobs) - failures} of {len(jobs)} datasets in {time.perf_counter() - start:.2f}s')
+    return failures
+
+def seconds_until(daily_at):
+    now = datetime.datetime.now()
+    next_run = now.replace(hour=daily_at.hour, minute=daily_at.minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += datetime.timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+@click.command()
+@click.option('--name', '-n', multiple=True, help='Only warm the datasets of this apps module, e.g. -n SLA_BL')
+@click.option('--workers', '-w', default=4, show_default=True,
+              help='Maximum number of datasets queried at the same time')
+@click.option('--daily-at', default=None, help='Keep running and warm the cache every day at this time (HH:MM)')
+def main(name, workers, daily_at):
+    if daily_at is None:
+        raise SystemExit(1 if run(name, workers) else 0)
+    daily_at = datetime.datetime.strptime(daily_at, '%H:%M').time()
+    while True:
+        time.sleep(seconds_until(daily_at))
+        run(name, workers)
+
+if __name__ == '__main__':
+    main()